@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Severity Classifier Micro-Benchmark
+Compares the compiled word-boundary matcher against the original
+per-keyword substring scan.
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from drug_checker import RED_KEYWORDS, YELLOW_KEYWORDS, detect_severity, detect_severity_batch
+
+FILLER_WORDS = [
+    "the", "plasma", "concentration", "of", "patients", "receiving", "was",
+    "increased", "clinical", "studies", "dose", "adjustment", "hepatic",
+    "clearance", "coadministration", "with", "inhibitors", "cytochrome",
+    "substrates", "observed", "in", "healthy", "volunteers", "pharmacokinetic"
+]
+
+def legacy_detect_severity(text):
+    """Original implementation: one substring scan per keyword."""
+    text_lower = text.lower()
+    if any(keyword in text_lower for keyword in RED_KEYWORDS):
+        return "🔴 High"
+    elif any(keyword in text_lower for keyword in YELLOW_KEYWORDS):
+        return "🟡 Moderate"
+    return "🟢 Low"
+
+def make_label_text(size, keyword=None, rng=random):
+    """Build label-like filler text of roughly `size` characters."""
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(FILLER_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    if keyword:
+        words.append(keyword)
+    return " ".join(words)
+
+def bench(label, func, arg, number):
+    """Time func(arg) and print microseconds per call."""
+    seconds = min(timeit.repeat(lambda: func(arg), number=number, repeat=5))
+    print(f"{label:<40} {seconds / number * 1e6:>10.1f} µs/call")
+    return seconds / number
+
+def main():
+    rng = random.Random(42)
+    print("=" * 70)
+    print("SEVERITY CLASSIFIER BENCHMARK")
+    print("=" * 70)
+    
+    for size in (2_000, 20_000, 80_000):
+        # Worst case for both: no keyword at all, whole text scanned
+        text = make_label_text(size, rng=rng)
+        print(f"\n{size // 1000} KB label, no keywords:")
+        old = bench("  legacy substring scan", legacy_detect_severity, text, 200)
+        new = bench("  compiled matcher", detect_severity, text, 200)
+        print(f"  speedup: {old / new:.1f}x")
+        
+        text = make_label_text(size, keyword="monitor", rng=rng)
+        print(f"{size // 1000} KB label, trailing moderate keyword:")
+        old = bench("  legacy substring scan", legacy_detect_severity, text, 200)
+        new = bench("  compiled matcher", detect_severity, text, 200)
+        print(f"  speedup: {old / new:.1f}x")
+    
+    texts = [make_label_text(10_000, keyword=rng.choice([None, "avoid", "risk"]), rng=rng) for _ in range(500)]
+    print("\nBatch of 500 x 10 KB pair texts:")
+    old = bench("  legacy (loop)", lambda ts: [legacy_detect_severity(t) for t in ts], texts, 3)
+    new = bench("  detect_severity_batch", detect_severity_batch, texts, 3)
+    print(f"  speedup: {old / new:.1f}x")
+    
+    # Where the two disagree because of word boundaries
+    samples = ["avoidance of alcohol", "an asterisk marks", "do not exceed", "reduced clearance"]
+    print("\nBoundary behaviour (legacy -> compiled):")
+    for sample in samples:
+        print(f"  {sample!r:<28} {legacy_detect_severity(sample)} -> {detect_severity(sample)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Reproducible Benchmark Suite
+Runs the checker against the local OpenFDA and Ollama stand-ins replaying
+the recorded responses in fixtures/, and reports p50/p95/p99 latency and
+throughput for single checks, checking a drug against a medication list
+(cold and warm caches), and cache/history I/O as the tables grow.
+
+Results are written as JSON so runs from different commits can be
+compared with --compare.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import drug_checker
+from stubs import FIXTURES_DIR, StubConfig, load_fixtures, point_checker_at, start_stub_server
+
+MY_MEDS = [
+    "warfarin", "metformin", "lisinopril", "simvastatin", "omeprazole",
+    "atorvastatin", "clopidogrel", "sertraline", "amlodipine", "levothyroxine"
+]
+NEW_DRUGS = ["aspirin", "ibuprofen"]
+STORAGE_SIZES = [100, 1000, 10000]
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize_samples(samples):
+    """Latency percentiles in ms plus throughput in operations per second."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "mean_ms": round(total / len(ordered) * 1000, 3),
+        "throughput_per_s": round(len(ordered) / total, 2) if total else None
+    }
+
+def timed(func, *args):
+    """Run func with stdout silenced, returning the elapsed seconds."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - started
+
+def fresh_data_dir(stub_url, root):
+    """Point the checker at a new, empty data directory under root."""
+    point_checker_at(stub_url, tempfile.mkdtemp(dir=root))
+
+def check_against_list(new_drug, others):
+    return list(drug_checker.check_drug_against_many(new_drug, others))
+
+def bench_single_checks(stub_url, root, pairs):
+    """Time check_interaction with empty caches, then again with warm ones."""
+    cold, warm = [], []
+    for drug1, drug2 in pairs:
+        fresh_data_dir(stub_url, root)
+        cold.append(timed(drug_checker.check_interaction, drug1, drug2, False))
+        warm.append(timed(drug_checker.check_interaction, drug1, drug2, False))
+    return {"single_check_cold": summarize_samples(cold), "single_check_warm": summarize_samples(warm)}
+
+def bench_med_list(stub_url, root, iterations):
+    """Time checking a new drug against the medication list, cold then warm."""
+    cold, warm = [], []
+    for i in range(iterations):
+        new_drug = NEW_DRUGS[i % len(NEW_DRUGS)]
+        fresh_data_dir(stub_url, root)
+        cold.append(timed(check_against_list, new_drug, MY_MEDS))
+        warm.append(timed(check_against_list, new_drug, MY_MEDS))
+    return {"check_against_my_meds_cold": summarize_samples(cold), "check_against_my_meds_warm": summarize_samples(warm)}
+
+def prefill_storage(rows, rng):
+    """Fill pair_cache and history with `rows` synthetic entries."""
+    now = datetime.now().isoformat()
+    used = time.time()
+    expires = used + drug_checker.PAIR_CACHE_TTL_SECONDS
+    names = [f"drug{i}" for i in range(rows)]
+    with drug_checker.get_db() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO pair_cache (key, severity, summary, timestamp, expires, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (drug_checker.get_cache_key(name, "aspirin"), "🟢 Low", "No interaction found.", now, expires, used)
+                for name in names
+            )
+        )
+        conn.executemany(
+            "INSERT INTO history (drug1, drug2, severity, summary, timestamp) VALUES (?, ?, ?, ?, ?)",
+            ((rng.choice(names), "aspirin", "🟢 Low", "No interaction found.", now) for _ in range(rows))
+        )
+    return names
+
+def bench_storage(stub_url, root, iterations, rng):
+    """Time cache and history operations with the tables at each size in STORAGE_SIZES."""
+    results = {}
+    retention, max_entries = drug_checker.HISTORY_RETENTION, drug_checker.PAIR_CACHE_MAX_ENTRIES
+    # Let both tables grow past their caps so growth is what gets measured
+    drug_checker.HISTORY_RETENTION = None
+    drug_checker.PAIR_CACHE_MAX_ENTRIES = max(STORAGE_SIZES) * 2
+    try:
+        for rows in STORAGE_SIZES:
+            fresh_data_dir(stub_url, root)
+            names = prefill_storage(rows, rng)
+            ops = {
+                "cache_lookup": lambda: drug_checker.get_cached_result(rng.choice(names), "aspirin"),
+                "cache_write": lambda: drug_checker.cache_result(rng.choice(names), "warfarin", "🟡 Medium", "Monitor."),
+                "history_append": lambda: drug_checker.add_to_history(rng.choice(names), "warfarin", "🟡 Medium", "Monitor."),
+                "history_show": lambda: drug_checker.show_history(10)
+            }
+            for op, func in ops.items():
+                results[f"{op}_{rows}"] = summarize_samples([timed(func) for _ in range(iterations)])
+    finally:
+        drug_checker.HISTORY_RETENTION, drug_checker.PAIR_CACHE_MAX_ENTRIES = retention, max_entries
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, baseline=None):
+    print(f"{'scenario':<34} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9}" + ("  p50 vs base" if baseline else ""))
+    for name, stats in results.items():
+        line = (
+            f"{name:<34} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+            f"{stats['p99_ms']:>9.2f} {stats['throughput_per_s'] or 0:>9.1f}"
+        )
+        base = (baseline or {}).get(name)
+        if base and base["p50_ms"]:
+            line += f"  {(stats['p50_ms'] / base['p50_ms'] - 1) * 100:>+10.1f}%"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20, help="samples per scenario")
+    parser.add_argument("--fda-latency", type=float, default=0.05, help="seconds per label request")
+    parser.add_argument("--ollama-latency", type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="seconds between streamed tokens")
+    parser.add_argument("--jitter", type=float, default=0.2, help="latency jitter as a fraction (+/-)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures", default=str(FIXTURES_DIR), help="directory of recorded responses")
+    parser.add_argument("--output", "-o", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        fda_latency=args.fda_latency, ollama_latency=args.ollama_latency, token_delay=args.token_delay,
+        jitter=args.jitter, seed=args.seed, fixtures_dir=args.fixtures
+    )
+    _, stub_url = start_stub_server(config)
+    rng = random.Random(args.seed)
+    recorded_drugs = sorted(load_fixtures(args.fixtures)[0])
+    pairs = [tuple(rng.sample(recorded_drugs, 2)) for _ in range(args.iterations)]
+
+    print("=" * 70)
+    print("BENCHMARK SUITE (local stand-ins, recorded responses)")
+    print("=" * 70)
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        results.update(bench_single_checks(stub_url, root, pairs))
+        results.update(bench_med_list(stub_url, root, max(1, args.iterations // 4)))
+        results.update(bench_storage(stub_url, root, args.iterations * 5, rng))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "stub_requests": config.counts
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+    print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Label Dump Ingest Check
+Ingests the small openFDA-format dump in fixtures/ (as plain JSON and
+zipped) and asserts on what the local label index then returns. Also
+streams the dump at tiny chunk sizes so records, strings and the meta
+block straddle every possible read boundary.
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import drug_checker
+
+SAMPLE_DUMP = Path(__file__).resolve().parent / "fixtures" / "drug-label-sample.json"
+MAX_CHUNK_SIZE = 64
+
+def check_chunk_boundaries(text, expected):
+    """Every chunk size must yield exactly the records json.loads finds."""
+    for chunk_size in range(1, MAX_CHUNK_SIZE + 1):
+        records = list(drug_checker.iter_label_records(io.StringIO(text), chunk_size=chunk_size))
+        assert records == expected, f"chunk_size={chunk_size}: got {len(records)} records"
+
+def check_index(dump_path, data_dir):
+    """Ingest dump_path into a fresh data directory and query the index."""
+    drug_checker.set_data_directory(data_dir)
+    drug_checker.setup_data_directory()
+    with contextlib.redirect_stdout(io.StringIO()):
+        count = drug_checker.ingest_label_dump([dump_path])
+    # The record with neither names nor interactions is skipped
+    assert count == 4, count
+    assert drug_checker.label_index_ready()
+
+    warfarin = drug_checker.lookup_local_interactions("warfarin")
+    assert len(warfarin) == 2, warfarin
+    assert any("{including fatal} hemorrhage" in text for text in warfarin), warfarin
+    assert any('"any other" NSAID ]' in text for text in warfarin), warfarin
+
+    # drug_interactions given as a plain string rather than a list
+    topiramate = drug_checker.lookup_local_interactions("topiramate")
+    assert len(topiramate) == 1 and "Señal" in topiramate[0], topiramate
+    # A label without interaction text is named but not searchable
+    assert drug_checker.lookup_local_interactions("simvastatin") == []
+    assert drug_checker.lookup_local_interactions("zorblax") == []
+
+    assert drug_checker.lookup_local_suggestions("adv") == ["advil", "advil migraine"]
+    assert drug_checker.lookup_local_suggestions("WAR") == ["warfarin sodium"]
+    assert drug_checker.lookup_local_suggestions("zo") == ["zocor"]
+    assert drug_checker.lookup_local_suggestions("adv", limit=1) == ["advil"]
+
+def main():
+    text = SAMPLE_DUMP.read_text(encoding="utf-8")
+    check_chunk_boundaries(text, json.loads(text)["results"])
+    print(f"✓ Records identical at every chunk size up to {MAX_CHUNK_SIZE}")
+
+    with tempfile.TemporaryDirectory() as root:
+        check_index(SAMPLE_DUMP, Path(root) / "plain")
+
+        zipped = Path(root) / "drug-label-sample.json.zip"
+        with zipfile.ZipFile(zipped, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.write(SAMPLE_DUMP, SAMPLE_DUMP.name)
+        check_index(zipped, Path(root) / "zipped")
+    print("✓ Plain and zipped dumps give the expected index lookups")
+
+if __name__ == "__main__":
+    main()
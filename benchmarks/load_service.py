@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Service Load Test
+Runs `drug_checker.py serve` in-process against the local stand-ins and
+measures how throughput scales with the number of concurrent clients.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import drug_checker
+from stubs import StubConfig, start_stub_server, point_checker_at
+
+DRUGS = [
+    "warfarin", "aspirin", "ibuprofen", "metformin", "lisinopril", "simvastatin",
+    "omeprazole", "atorvastatin", "amlodipine", "clopidogrel", "sertraline", "fluoxetine"
+]
+
+def start_service():
+    """Run an InteractionService on a background event loop, returning (service, base_url)."""
+    service = drug_checker.InteractionService()
+    ready = threading.Event()
+    port = []
+
+    def on_ready(bound_port):
+        port.append(bound_port)
+        ready.set()
+
+    threading.Thread(target=asyncio.run, args=(service.serve(port=0, ready=on_ready),), daemon=True).start()
+    ready.wait()
+    return service, f"http://127.0.0.1:{port[0]}"
+
+def run_level(base_url, clients, requests_per_client, rng):
+    """Fire requests from `clients` threads, returning (elapsed, latencies, statuses)."""
+    pairs = [tuple(rng.sample(DRUGS, 2)) for _ in range(clients * requests_per_client)]
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def client(worker):
+        session = requests.Session()
+        for drug1, drug2 in pairs[worker::clients]:
+            started = time.perf_counter()
+            response = session.get(f"{base_url}/check", params={"drug1": drug1, "drug2": drug2}, timeout=120)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    return time.perf_counter() - started, latencies, statuses
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="comma-separated client counts")
+    parser.add_argument("--requests", type=int, default=8, help="requests per client")
+    parser.add_argument("--fda-latency", type=float, default=0.05)
+    parser.add_argument("--ollama-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    _, stub_url = start_stub_server(StubConfig(fda_latency=args.fda_latency, ollama_latency=args.ollama_latency))
+    service, base_url = start_service()
+    rng = random.Random(7)
+
+    print("=" * 70)
+    print("SERVICE LOAD TEST (cold caches at every level)")
+    print("=" * 70)
+    print(f"{'clients':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'coalesced':>10} {'503s':>6}")
+    for clients in (int(level) for level in args.levels.split(",")):
+        with tempfile.TemporaryDirectory() as data_dir:
+            point_checker_at(stub_url, data_dir)
+            service.stats = dict.fromkeys(service.stats, 0)
+            elapsed, latencies, statuses = run_level(base_url, clients, args.requests, rng)
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(
+            f"{clients:>8} {len(latencies) / elapsed:>8.1f} {statistics.median(latencies) * 1000:>8.0f} "
+            f"{p95 * 1000:>8.0f} {service.stats['coalesced']:>10} {statuses.get(503, 0):>6}"
+        )
+
+if __name__ == "__main__":
+    main()
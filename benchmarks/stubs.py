@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Local OpenFDA and Ollama Stand-ins
+A threaded HTTP server that answers the label search and generate
+endpoints the checker calls, with configurable latency, so benchmarks
+run offline and reproducibly. With a fixtures directory it replays the
+recorded responses in fixtures/ instead of synthetic ones.
+"""
+
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+import drug_checker
+
+SYNTHETIC_SUMMARY = (
+    "Taking these medicines together may increase the risk of bleeding. "
+    "Your doctor may need to monitor you more closely. "
+    "Tell your doctor if you notice unusual bruising. "
+    "This sentence should be cut off by the three-sentence limit."
+)
+
+def synthetic_label(search):
+    """Build a label result whose interaction text mentions the searched drug."""
+    drug = search.split(" ", 1)[0].split(":", 1)[-1].strip('"*')
+    return {
+        "openfda": {"brand_name": [f"{drug.title()} Brand"], "generic_name": [drug.upper()]},
+        "drug_interactions": [
+            f"Coadministration with {drug} may increase plasma concentrations. "
+            f"Monitor patients receiving {drug} with anticoagulants for bleeding risk."
+        ]
+    }
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    """Load recorded label responses (keyed by drug) and generate responses."""
+    fixtures_dir = Path(fixtures_dir)
+    with open(fixtures_dir / "openfda_labels.json", "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    with open(fixtures_dir / "ollama_responses.json", "r", encoding="utf-8") as f:
+        generations = json.load(f)
+    return labels, generations
+
+class StubConfig:
+    """Latency settings, replayed fixtures and request counters shared by the handler threads."""
+
+    def __init__(self, fda_latency=0.05, ollama_latency=0.2, token_delay=0.005, jitter=0.0, seed=0,
+                 fixtures_dir=None):
+        self.fda_latency = fda_latency
+        self.ollama_latency = ollama_latency
+        self.token_delay = token_delay
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"label": 0, "generate": 0}
+        self.labels, self.generations = load_fixtures(fixtures_dir) if fixtures_dir else ({}, [])
+
+    def label_response(self, search, limit, skip=0):
+        """Recorded results for the search if there are any, else synthetic ones."""
+        # Clauses are OR'ed: `drug_interactions:warfarin drug_interactions:"warfarin sodium"`
+        clauses = [clause.partition(":") for clause in re.findall(r'[\w.]+:(?:"[^"]*"|\S+)', search)]
+        field = clauses[0][0] if clauses else ""
+        term = clauses[0][2].strip('"').lower() if clauses else ""
+        results = []
+        for clause_field, _, clause_term in clauses:
+            recorded = self.labels.get(clause_term.strip('"').lower())
+            if clause_field == "drug_interactions" and recorded:
+                # A label matching several clauses is returned once
+                results.extend(result for result in recorded["results"] if result not in results)
+        if not results and field == "openfda.brand_name" and self.labels:
+            prefix = term.rstrip("*")
+            results = [
+                result for recorded in self.labels.values() for result in recorded["results"]
+                if any(name.lower().startswith(prefix) for name in result["openfda"].get("brand_name", []))
+            ]
+        if not results:
+            results = [synthetic_label(search) for _ in range(min(limit, 3))]
+        return {"meta": {"results": {"skip": skip, "limit": limit, "total": len(results)}},
+                "results": results[skip:skip + limit]}
+
+    def generate_response(self, prompt):
+        """Recorded generate response chosen deterministically by prompt, else the synthetic one."""
+        if not self.generations:
+            return {"response": SYNTHETIC_SUMMARY, "done": True}
+        return self.generations[zlib.crc32(prompt.encode("utf-8")) % len(self.generations)]
+
+    def sleep(self, seconds):
+        """Sleep for seconds plus up to +/- jitter of it."""
+        with self.lock:
+            factor = 1 + self.rng.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, seconds * factor))
+
+    def count(self, endpoint):
+        with self.lock:
+            self.counts[endpoint] += 1
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != "/drug/label.json":
+            return self.send_json({"status": "Ollama is running"})
+
+        self.config.count("label")
+        self.config.sleep(self.config.fda_latency)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.send_json(self.config.label_response(
+            params.get("search", ""), int(params.get("limit", 1)), int(params.get("skip", 0))
+        ))
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self.config.count("generate")
+        self.config.sleep(self.config.ollama_latency)
+        recorded = self.config.generate_response(body.get("prompt", ""))
+        tokens = [word + " " for word in recorded["response"].split()]
+
+        if not body.get("stream", True):
+            return self.send_json(dict(recorded, eval_count=recorded.get("eval_count", len(tokens))))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        started = time.monotonic()
+        try:
+            for token in tokens:
+                self.write_chunk({"response": token, "done": False})
+                time.sleep(self.config.token_delay)
+            self.write_chunk({
+                "response": "", "done": True, "eval_count": len(tokens),
+                "eval_duration": int((time.monotonic() - started) * 1e9)
+            })
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The checker hung up after three sentences
+            pass
+
+    def write_chunk(self, payload):
+        line = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is expected, not an error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+def start_stub_server(config=None, port=0):
+    """Start the stand-in server in a daemon thread, returning (server, base_url)."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config or StubConfig()})
+    server = StubServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def point_checker_at(base_url, data_dir):
+    """Send the checker's OpenFDA and Ollama calls to base_url and use a fresh data directory."""
+    drug_checker.OPENFDA_LABEL_ENDPOINT = f"{base_url}/drug/label.json"
+    drug_checker.OLLAMA_API = f"{base_url}/api/generate"
+    drug_checker.set_data_directory(data_dir)
+    drug_checker.setup_data_directory()
+
+if __name__ == "__main__":
+    server, url = start_stub_server(
+        StubConfig(fixtures_dir=FIXTURES_DIR), port=int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    )
+    print(f"Stub OpenFDA: {url}/drug/label.json")
+    print(f"Stub Ollama:  {url}/api/generate")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
@@ -5,11 +5,31 @@ Drug Interaction Checker MVP
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from prettytable import PrettyTable
+import argparse
+import asyncio
+import bisect
+import contextlib
+import csv
+import functools
+import hashlib
+import io
 import json
 import os
-from datetime import datetime
+import queue
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
 from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
 
 # ============================================================================
 # CONFIGURATION
@@ -18,11 +38,124 @@ from pathlib import Path
 OPENFDA_LABEL_ENDPOINT = "https://api.fda.gov/drug/label.json"
 OLLAMA_API = "http://localhost:11434/api/generate"
 OLLAMA_MODEL = "llama3.2"
+# How long Ollama keeps the model loaded after a request, so checks a few
+# minutes apart don't each pay the model load time
+OLLAMA_KEEP_ALIVE = "30m"
+
+# What the interactive menu warms in the background for the saved medications:
+# "none", "labels" (their OpenFDA labels) or "all" (labels plus the regimen
+# matrix summaries, which share Ollama with the first checks)
+STARTUP_PREFETCH = "labels"
+
+# Connection pool shared by every OpenFDA and Ollama call in the process
+HTTP_POOL_SIZE = 10
+FETCH_WORKERS = 4
+
+# Batch checks: label downloads and Ollama summaries running at once
+MAX_CONCURRENT_FETCHES = 4
+MAX_CONCURRENT_SUMMARIES = 2
+
+# Regimen and batch checks fetch labels for up to BULK_QUERY_MAX_DRUGS drugs in
+# one OR-combined OpenFDA query, reading at most BULK_MAX_PAGES pages of
+# (labels per drug x drugs) results before querying leftover drugs one by one
+BULK_QUERY_MAX_DRUGS = 10
+BULK_MAX_PAGES = 3
+
+# Transient upstream failures (connection errors, timeouts, 429 and 5xx) are
+# retried with jittered exponential backoff, honouring Retry-After up to the cap
+HTTP_MAX_RETRIES = 2
+HTTP_BACKOFF_BASE = 0.5
+HTTP_BACKOFF_MAX = 8.0
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+# After CIRCUIT_FAILURE_THRESHOLD failures in a row an upstream is skipped for
+# CIRCUIT_COOLDOWN_SECONDS; then a single trial request decides if it recovered
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN_SECONDS = 30
+
+# Local JSON service for the Flutter app (`drug_checker.py serve`)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_WORKERS = 16
+# Uncached pairs allowed in flight before new ones get 503 Busy
+SERVICE_MAX_PENDING = 32
+
+ASSETS_DIR = Path(__file__).resolve().parent / "assets"
+DRUG_ALIASES_FILE = ASSETS_DIR / "drug_aliases.json"
+DDINTER_CSV_PATTERN = "ddinter_downloads_code_*.csv"
 
 DATA_DIR = Path("drug_checker_data")
+DB_FILE = DATA_DIR / "drug_checker.db"
+
+# Several processes may share DATA_DIR; a writer waits this long for another's lock
+DB_BUSY_TIMEOUT_SECONDS = 10
+# Pair and label cache reads are kept in memory until a worker changes those tables
+READ_CACHE_MAX_ENTRIES = 4096
+# Cache hits refresh an entry's LRU time at most this often, so hot reads don't write
+LRU_TOUCH_INTERVAL_SECONDS = 600
+# How often aliases learned by other workers are picked up
+ALIAS_REFRESH_SECONDS = 1.0
+
+# Legacy JSON files, imported into DB_FILE once on first start
 MY_MEDS_FILE = DATA_DIR / "my_medications.json"
 HISTORY_FILE = DATA_DIR / "check_history.json"
 CACHE_FILE = DATA_DIR / "interaction_cache.json"
+LABEL_CACHE_FILE = DATA_DIR / "label_cache.json"
+
+# How long a drug's downloaded label text is reused before refetching
+LABEL_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# Checked pairs are reused for PAIR_CACHE_TTL_SECONDS (callers may pass their own
+# TTL per entry); after that they are still served while a background refresh
+# re-fetches the labels. Least recently used pairs are evicted over the cap.
+PAIR_CACHE_TTL_SECONDS = 7 * 24 * 3600
+PAIR_CACHE_MAX_ENTRIES = 5000
+
+# Interactive checks and service requests wait at most this long (from the start
+# of the check) for Ollama before answering with an extractive summary of the
+# label; the AI summary still finishes in the background and replaces it in the
+# cache. None waits for Ollama however long it takes (batch mode).
+SUMMARY_DEADLINE_SECONDS = 20
+SERVICE_SUMMARY_DEADLINE_SECONDS = 8
+
+# Unknown results, failed summaries and extractive summaries are cached this long instead, and are
+# recomputed rather than served stale once expired
+NEGATIVE_CACHE_TTL_SECONDS = 10 * 60
+
+# Ollama summaries memoized by prompt hash, least recently used evicted first
+SUMMARY_CACHE_MAX_ENTRIES = 5000
+
+# Check history keeps the newest HISTORY_RETENTION entries (None keeps all);
+# older ones are trimmed in the background every HISTORY_COMPACT_EVERY checks
+HISTORY_RETENTION = 100
+HISTORY_COMPACT_EVERY = 50
+
+# Local label index built by `drug_checker.py ingest` from the openFDA bulk
+# drug-label download; fall back to the live API when it has no answer
+USE_LOCAL_LABEL_INDEX = True
+LIVE_API_FALLBACK = True
+
+# Stage timings kept per stage for the percentiles in --profile output
+METRICS_MAX_SAMPLES = 1000
+
+# Class names a label may use instead of naming the drug itself
+DRUG_CLASSES = {
+    "anticoagulant": ["warfarin", "apixaban", "rivaroxaban", "dabigatran", "edoxaban", "heparin"],
+    "antiplatelet": ["aspirin", "clopidogrel", "prasugrel", "ticagrelor"],
+    "platelet inhibitor": ["aspirin", "clopidogrel", "prasugrel", "ticagrelor"],
+    "salicylate": ["aspirin", "acetylsalicylic acid"],
+    "nsaid": ["ibuprofen", "naproxen", "aspirin", "diclofenac", "celecoxib", "meloxicam", "ketorolac"],
+    "nonsteroidal anti-inflammatory drug": ["ibuprofen", "naproxen", "aspirin", "diclofenac", "celecoxib", "meloxicam", "ketorolac"],
+    "statin": ["atorvastatin", "simvastatin", "rosuvastatin", "pravastatin", "lovastatin"],
+    "hmg-coa reductase inhibitor": ["atorvastatin", "simvastatin", "rosuvastatin", "pravastatin", "lovastatin"],
+    "ace inhibitor": ["lisinopril", "enalapril", "ramipril", "captopril", "benazepril"],
+    "proton pump inhibitor": ["omeprazole", "esomeprazole", "lansoprazole", "pantoprazole"],
+    "ssri": ["sertraline", "fluoxetine", "citalopram", "escitalopram", "paroxetine"],
+    "selective serotonin reuptake inhibitor": ["sertraline", "fluoxetine", "citalopram", "escitalopram", "paroxetine"],
+    "thyroid hormone": ["levothyroxine"],
+}
+# Salt forms dropped to get a label's base drug name ("warfarin sodium" -> "warfarin")
+SALT_WORDS = {"sodium", "potassium", "calcium", "magnesium", "hydrochloride", "hcl", "sulfate", "besylate", "maleate", "tartrate", "succinate"}
 
 RED_KEYWORDS = [
     "contraindicated", "life-threatening", "fatal", "avoid", "do not", 
@@ -37,17 +170,26 @@ YELLOW_KEYWORDS = [
 # SETUP & UTILITIES
 # ============================================================================
 
+def set_data_directory(path):
+    """Point every data file at another directory (e.g. one per worker or benchmark)."""
+    global DATA_DIR, DB_FILE, MY_MEDS_FILE, HISTORY_FILE, CACHE_FILE, LABEL_CACHE_FILE
+    global _label_index_ready, _name_index, _alias_map
+    DATA_DIR = Path(path)
+    DB_FILE = DATA_DIR / DB_FILE.name
+    MY_MEDS_FILE = DATA_DIR / MY_MEDS_FILE.name
+    HISTORY_FILE = DATA_DIR / HISTORY_FILE.name
+    CACHE_FILE = DATA_DIR / CACHE_FILE.name
+    LABEL_CACHE_FILE = DATA_DIR / LABEL_CACHE_FILE.name
+    _label_index_ready = None
+    _name_index = None
+    _alias_map = None
+
 def setup_data_directory():
-    """Create data directory if it doesn't exist."""
+    """Create data directory and database if they don't exist."""
     DATA_DIR.mkdir(exist_ok=True)
-    
-    # Initialize files if they don't exist
-    if not MY_MEDS_FILE.exists():
-        save_json(MY_MEDS_FILE, [])
-    if not HISTORY_FILE.exists():
-        save_json(HISTORY_FILE, [])
-    if not CACHE_FILE.exists():
-        save_json(CACHE_FILE, {})
+    init_db()
+    migrate_json_files()
+    compact_history()
 
 def load_json(filepath):
     """Load JSON file safely."""
@@ -55,29 +197,773 @@ def load_json(filepath):
         with open(filepath, 'r') as f:
             return json.load(f)
     except:
-        return [] if filepath != CACHE_FILE else {}
+        return {} if filepath in (CACHE_FILE, LABEL_CACHE_FILE) else []
 
-def save_json(filepath, data):
-    """Save JSON file safely."""
+@contextlib.contextmanager
+def atomic_write(filepath, encoding="utf-8"):
+    """Open a file for writing that appears complete or not at all.
+    
+    Writes go to a temporary file in the same directory, which replaces
+    filepath only once everything is written.
+    """
+    filepath = Path(filepath)
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp")
     try:
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"⚠️ Error saving {filepath.name}: {e}")
-        return False
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+# ============================================================================
+# DATABASE
+# ============================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pair_cache (
+    key TEXT PRIMARY KEY,
+    severity TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    expires REAL NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS label_cache (
+    drug TEXT PRIMARY KEY,
+    texts TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS summary_cache (
+    hash TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS summary_cache_last_used ON summary_cache (last_used);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    drug1 TEXT NOT NULL,
+    drug2 TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS drug_names (
+    name TEXT PRIMARY KEY,
+    seen INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS drug_aliases (
+    alias TEXT PRIMARY KEY,
+    canonical TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS regimen_matrix (
+    key TEXT PRIMARY KEY,
+    drug1 TEXT NOT NULL,
+    drug2 TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS regimen_matrix_drug1 ON regimen_matrix (drug1);
+CREATE INDEX IF NOT EXISTS regimen_matrix_drug2 ON regimen_matrix (drug2);
+CREATE TABLE IF NOT EXISTS medications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+"""
+
+# Columns added after a table first shipped, as (table, column, definition).
+# Rows from older databases get the default, which marks cached pairs stale.
+SCHEMA_UPGRADES = [
+    ("pair_cache", "expires", "REAL NOT NULL DEFAULT 0"),
+    ("pair_cache", "last_used", "REAL NOT NULL DEFAULT 0"),
+]
+# Indexes and triggers on upgraded columns, created once the columns exist.
+# cache_version counts changes to cached results (not LRU touches) so every
+# worker's ReadCache can tell when its entries may be out of date.
+SCHEMA_AFTER_UPGRADES = """
+CREATE INDEX IF NOT EXISTS pair_cache_last_used ON pair_cache (last_used);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('cache_version', 0);
+CREATE TRIGGER IF NOT EXISTS pair_cache_inserted AFTER INSERT ON pair_cache
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'cache_version'; END;
+CREATE TRIGGER IF NOT EXISTS pair_cache_updated AFTER UPDATE OF severity, summary, expires ON pair_cache
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'cache_version'; END;
+CREATE TRIGGER IF NOT EXISTS pair_cache_deleted AFTER DELETE ON pair_cache
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'cache_version'; END;
+CREATE TRIGGER IF NOT EXISTS label_cache_inserted AFTER INSERT ON label_cache
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'cache_version'; END;
+CREATE TRIGGER IF NOT EXISTS label_cache_updated AFTER UPDATE ON label_cache
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'cache_version'; END;
+CREATE TRIGGER IF NOT EXISTS label_cache_deleted AFTER DELETE ON label_cache
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'cache_version'; END;
+"""
+
+_db_local = threading.local()
+
+def get_db():
+    """Get this thread's connection to the SQLite store."""
+    conn = getattr(_db_local, "conn", None)
+    if conn is None or _db_local.path != DB_FILE:
+        conn = sqlite3.connect(DB_FILE, timeout=DB_BUSY_TIMEOUT_SECONDS)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers proceed while a writer commits
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _db_local.conn = conn
+        _db_local.path = DB_FILE
+    return conn
+
+def init_db():
+    """Create database tables if they don't exist."""
+    conn = get_db()
+    conn.executescript(SCHEMA)
+    with conn:
+        # Hold the write lock while checking, so workers starting together upgrade once
+        conn.execute("BEGIN IMMEDIATE")
+        for table, column, definition in SCHEMA_UPGRADES:
+            columns = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    conn.executescript(SCHEMA_AFTER_UPGRADES)
+
+class ReadCache:
+    """In-process cache of pair and label cache reads, shared by all threads.
+    
+    Entries are dropped as soon as any connection, another thread here or
+    another worker process, commits a change to a cached result. PRAGMA
+    data_version on a private connection cheaply tells whether anything
+    was committed since the last look; only then is cache_version read.
+    """
+    
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or READ_CACHE_MAX_ENTRIES
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.conn = None
+        self.path = None
+        self.data_version = None
+        self.cache_version = None
+    
+    def validate(self):
+        """Drop every entry if cached results changed since the last call (lock held)."""
+        if self.conn is None or self.path != DB_FILE:
+            self.conn = sqlite3.connect(DB_FILE, timeout=DB_BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+            self.path = DB_FILE
+            self.data_version = None
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self.data_version:
+            return
+        self.data_version = data_version
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'cache_version'").fetchone()
+        cache_version = row[0] if row else None
+        if cache_version != self.cache_version:
+            self.entries.clear()
+            self.cache_version = cache_version
+    
+    def get(self, key, load):
+        """Get the cached value for key, calling load() to read it on a miss."""
+        with self.lock:
+            self.validate()
+            if key in self.entries:
+                return self.entries[key]
+            cache_version = self.cache_version
+        
+        value = load()
+        with self.lock:
+            # A write that landed meanwhile may have made value out of date
+            self.validate()
+            if self.cache_version == cache_version:
+                if len(self.entries) >= self.max_entries:
+                    self.entries.pop(next(iter(self.entries)))
+                self.entries[key] = value
+        return value
+
+_read_cache = ReadCache()
+
+def get_read_cache():
+    """Get the process-wide read cache."""
+    return _read_cache
+
+def migrate_json_files():
+    """Import the legacy JSON files into the database, once."""
+    conn = get_db()
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+        return
+    
+    with conn:
+        # Re-check under the write lock in case another worker got here first
+        conn.execute("BEGIN IMMEDIATE")
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+        for key, entry in load_json(CACHE_FILE).items():
+            conn.execute(
+                "INSERT OR IGNORE INTO pair_cache (key, severity, summary, timestamp) VALUES (?, ?, ?, ?)",
+                (key, entry['severity'], entry['summary'], entry['timestamp'])
+            )
+        for drug, entry in load_json(LABEL_CACHE_FILE).items():
+            conn.execute(
+                "INSERT OR IGNORE INTO label_cache (drug, texts, timestamp) VALUES (?, ?, ?)",
+                (drug, json.dumps(entry['texts']), entry['timestamp'])
+            )
+        conn.executemany(
+            "INSERT INTO history (drug1, drug2, severity, summary, timestamp) VALUES (?, ?, ?, ?, ?)",
+            [(e['drug1'], e['drug2'], e['severity'], e['summary'], e['timestamp']) for e in load_json(HISTORY_FILE)]
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO medications (name) VALUES (?)",
+            [(med,) for med in load_json(MY_MEDS_FILE)]
+        )
+        conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (datetime.now().isoformat(),))
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+class Metrics:
+    """Per-stage timing spans and labelled counters, safe to update from any thread."""
+    
+    enabled = True
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spans = {}
+        self.counters = {}
+    
+    @contextlib.contextmanager
+    def span(self, stage):
+        """Time the enclosed block as one call of stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+    
+    def observe(self, stage, seconds):
+        """Record one call of stage that took seconds."""
+        with self.lock:
+            stats = self.spans.setdefault(stage, {"count": 0, "total": 0.0, "max": 0.0, "samples": []})
+            # Keep the most recent METRICS_MAX_SAMPLES as a ring buffer
+            if len(stats['samples']) < METRICS_MAX_SAMPLES:
+                stats['samples'].append(seconds)
+            else:
+                stats['samples'][stats['count'] % METRICS_MAX_SAMPLES] = seconds
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+    
+    def incr(self, name, amount=1, **labels):
+        """Add amount to the counter name with the given labels."""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+    
+    def counter(self, name, **labels):
+        """Sum of counter name over every label set matching labels."""
+        wanted = set(labels.items())
+        with self.lock:
+            return sum(v for (n, l), v in self.counters.items() if n == name and wanted <= set(l))
+    
+    def snapshot(self):
+        """All spans and counters as plain JSON-serializable data."""
+        with self.lock:
+            spans = {stage: dict(stats, samples=sorted(stats['samples'])) for stage, stats in self.spans.items()}
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.counters.items())]
+        
+        def quantile(samples, q):
+            return samples[min(len(samples) - 1, int(len(samples) * q))]
+        
+        return {
+            "spans": {
+                stage: {
+                    "count": stats['count'],
+                    "total_seconds": round(stats['total'], 6),
+                    "mean_ms": round(stats['total'] / stats['count'] * 1000, 3),
+                    "p50_ms": round(quantile(stats['samples'], 0.5) * 1000, 3),
+                    "p95_ms": round(quantile(stats['samples'], 0.95) * 1000, 3),
+                    "max_ms": round(stats['max'] * 1000, 3)
+                }
+                for stage, stats in spans.items()
+            },
+            "counters": counters
+        }
+    
+    def to_json(self):
+        """Export as a JSON document."""
+        return json.dumps(self.snapshot(), indent=2)
+    
+    def to_prometheus(self):
+        """Export in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP drug_checker_stage_seconds Time spent in each stage of a check.",
+            "# TYPE drug_checker_stage_seconds summary"
+        ]
+        for stage, stats in snapshot['spans'].items():
+            for q in ("0.5", "0.95"):
+                value = round(stats['p50_ms' if q == "0.5" else 'p95_ms'] / 1000, 6)
+                lines.append(f'drug_checker_stage_seconds{{stage="{stage}",quantile="{q}"}} {value}')
+            lines.append(f'drug_checker_stage_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]}')
+            lines.append(f'drug_checker_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        
+        typed = set()
+        for counter in snapshot['counters']:
+            name = f"drug_checker_{counter['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            labels = ",".join(f'{k}="{v}"' for k, v in counter['labels'].items())
+            lines.append(f"{name}{{{labels}}} {counter['value']}" if labels else f"{name} {counter['value']}")
+        return "\n".join(lines) + "\n"
+
+class NullMetrics:
+    """Stand-in used while profiling is off; every call is a no-op."""
+    
+    enabled = False
+    _span = contextlib.nullcontext()
+    
+    def span(self, stage):
+        return self._span
+    
+    def observe(self, stage, seconds):
+        pass
+    
+    def incr(self, name, amount=1, **labels):
+        pass
+
+_metrics = NullMetrics()
+
+def get_metrics():
+    """Get the process-wide metrics recorder (a no-op unless enabled)."""
+    return _metrics
+
+def enable_metrics():
+    """Start recording spans and counters, returning the recorder."""
+    global _metrics
+    if not _metrics.enabled:
+        _metrics = Metrics()
+    return _metrics
+
+def get_upstream(url):
+    """Name the upstream service a request URL belongs to."""
+    return "openfda" if url.startswith(OPENFDA_LABEL_ENDPOINT) else "ollama"
+
+def record_http_response(response, *args, **kwargs):
+    """Session response hook counting HTTP statuses per upstream."""
+    get_metrics().incr("http_responses_total", upstream=get_upstream(response.url), status=response.status_code)
+
+def print_profile(metrics):
+    """Print where the time went, cache hit rates and upstream stats."""
+    snapshot = metrics.snapshot()
+    print("\n📊 Profile")
+    stages = PrettyTable()
+    stages.field_names = ["Stage", "Calls", "Total s", "Mean ms", "p50 ms", "p95 ms", "Max ms"]
+    stages.align = "r"
+    stages.align["Stage"] = "l"
+    for stage, stats in sorted(snapshot['spans'].items(), key=lambda item: -item[1]['total_seconds']):
+        stages.add_row([
+            stage, stats['count'], f"{stats['total_seconds']:.3f}", f"{stats['mean_ms']:.1f}",
+            f"{stats['p50_ms']:.1f}", f"{stats['p95_ms']:.1f}", f"{stats['max_ms']:.1f}"
+        ])
+    print(stages)
+    
+    counters = PrettyTable()
+    counters.field_names = ["Counter", "Labels", "Value"]
+    counters.align = "l"
+    counters.align["Value"] = "r"
+    for counter in snapshot['counters']:
+        labels = ", ".join(f"{k}={v}" for k, v in counter['labels'].items())
+        value = counter['value']
+        counters.add_row([counter['name'], labels, f"{value:.3f}" if isinstance(value, float) else value])
+    print(counters)
+    
+    tokens = metrics.counter("ollama_eval_tokens_total")
+    seconds = metrics.counter("ollama_eval_seconds_total")
+    if seconds:
+        print(f"🤖 Ollama: {tokens} tokens in {seconds:.2f}s ({tokens / seconds:.1f} tokens/s)")
+
+def export_metrics(metrics, path):
+    """Write metrics to path, as JSON for .json files and Prometheus text otherwise."""
+    text = metrics.to_json() if str(path).endswith(".json") else metrics.to_prometheus()
+    with atomic_write(path) as f:
+        f.write(text)
+
+# ============================================================================
+# HTTP CONNECTION POOL
+# ============================================================================
+
+_http_session = None
+_fetch_executor = None
+_summary_executor = None
+_background_executor = None
+_http_lock = threading.Lock()
+
+def get_http_session():
+    """Get the shared keep-alive HTTP session (created on first use)."""
+    global _http_session
+    if _http_session is None:
+        with _http_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.hooks["response"].append(record_http_response)
+                _http_session = session
+    return _http_session
+
+def get_fetch_executor():
+    """Get the shared thread pool used for concurrent label fetches."""
+    global _fetch_executor
+    if _fetch_executor is None:
+        with _http_lock:
+            if _fetch_executor is None:
+                _fetch_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="fetch")
+    return _fetch_executor
+
+def get_background_executor():
+    """Get the single-thread pool for maintenance work off the request path."""
+    global _background_executor
+    if _background_executor is None:
+        with _http_lock:
+            if _background_executor is None:
+                _background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background")
+    return _background_executor
+
+def get_summary_executor():
+    """Get the shared thread pool used for Ollama summaries."""
+    global _summary_executor
+    if _summary_executor is None:
+        with _http_lock:
+            if _summary_executor is None:
+                _summary_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SUMMARIES, thread_name_prefix="summary")
+    return _summary_executor
+
+# ============================================================================
+# RESILIENCE
+# ============================================================================
+
+class CircuitOpen(requests.exceptions.ConnectionError):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+class CircuitBreaker:
+    """Fail fast for a cool-down period once an upstream keeps failing.
+    
+    Closed: requests go through and failures in a row are counted. Open:
+    requests are refused until the cool-down ends. Half-open: one trial
+    request goes through; success closes the breaker, failure reopens it.
+    """
+    
+    def __init__(self, name, threshold=None, cooldown=None):
+        self.name = name
+        self.threshold = threshold or CIRCUIT_FAILURE_THRESHOLD
+        self.cooldown = cooldown or CIRCUIT_COOLDOWN_SECONDS
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+    
+    def allow(self):
+        """Whether a request may be sent now."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+    
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.threshold:
+                if self.opened_at is None or self.trial_in_flight:
+                    get_metrics().incr("circuit_opened_total", upstream=self.name)
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+_circuit_breakers = {}
+
+def get_circuit_breaker(upstream):
+    """Get the shared circuit breaker for an upstream ("openfda" or "ollama")."""
+    with _http_lock:
+        if upstream not in _circuit_breakers:
+            _circuit_breakers[upstream] = CircuitBreaker(upstream)
+        return _circuit_breakers[upstream]
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number attempt (0-based), with full jitter."""
+    if retry_after:
+        try:
+            return min(float(retry_after), HTTP_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
+
+def request_with_retries(method, url, upstream, max_retries=None, retry_read_timeouts=True, **kwargs):
+    """Send a request on the shared session through the upstream's circuit breaker.
+    
+    Connection errors, timeouts and TRANSIENT_STATUSES are retried up to
+    max_retries times (HTTP_MAX_RETRIES by default). The last transient
+    response is returned for the caller's raise_for_status; the last
+    exception is raised. With retry_read_timeouts False, a read timeout
+    is raised at once. Any other exception counts as a failure and is
+    raised at once. CircuitOpen is raised while the breaker is open.
+    """
+    breaker = get_circuit_breaker(upstream)
+    max_retries = HTTP_MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(max_retries + 1):
+        if not breaker.allow():
+            get_metrics().incr("circuit_rejected_total", upstream=upstream)
+            raise CircuitOpen(f"{upstream} skipped for up to {breaker.cooldown}s after repeated failures")
+        try:
+            response = get_http_session().request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            breaker.record_failure()
+            if attempt == max_retries or (isinstance(e, requests.exceptions.ReadTimeout) and not retry_read_timeouts):
+                raise
+            delay = backoff_delay(attempt)
+        except Exception:
+            # Not worth retrying, but a half-open trial must still be resolved
+            breaker.record_failure()
+            raise
+        else:
+            if response.status_code not in TRANSIENT_STATUSES:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt == max_retries:
+                return response
+            delay = backoff_delay(attempt, response.headers.get("Retry-After"))
+            response.close()
+        get_metrics().incr("http_retries_total", upstream=upstream)
+        time.sleep(delay)
+
+# ============================================================================
+# LOCAL LABEL INDEX
+# ============================================================================
+
+LABEL_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    brand_names TEXT NOT NULL,
+    generic_names TEXT NOT NULL,
+    drug_interactions TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS labels_fts USING fts5(
+    drug_interactions, content='labels', content_rowid='id'
+);
+CREATE TABLE IF NOT EXISTS label_names (
+    name TEXT NOT NULL,
+    label_id INTEGER NOT NULL,
+    PRIMARY KEY (name, label_id)
+) WITHOUT ROWID;
+"""
+
+_label_index_ready = None
+
+def label_index_ready():
+    """Check whether a bulk label dump has been ingested."""
+    global _label_index_ready
+    if _label_index_ready is None:
+        row = get_db().execute("SELECT 1 FROM meta WHERE key = 'label_index_ingested'").fetchone()
+        _label_index_ready = row is not None
+    return USE_LOCAL_LABEL_INDEX and _label_index_ready
+
+def iter_label_records(fp, chunk_size=1 << 20):
+    """Yield records from an openFDA drug-label JSON file one at a time.
+    
+    Only the current record is held in memory, so multi-GB dumps can be
+    streamed straight out of their zip archives.
+    """
+    decoder = json.JSONDecoder()
+    results_start = re.compile(r'"results"\s*:\s*\[')
+    buffer = ""
+    
+    # Skip the meta block up to the opening bracket of the results array
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk
+        match = results_start.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        buffer = buffer[-64:]
+    
+    pos = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                return
+            buffer, pos = chunk, 0
+            continue
+        if buffer[pos] == "]":
+            return
+        
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Record continues past the end of the buffer
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        
+        yield record
+        pos = end
+
+def iter_dump_files(paths):
+    """Yield readable text streams for each .json or .json.zip dump file."""
+    for path in paths:
+        path = Path(path)
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for member in archive.namelist():
+                    if member.endswith(".json"):
+                        with archive.open(member) as raw:
+                            yield io.TextIOWrapper(raw, encoding="utf-8")
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield f
+
+def ingest_label_dump(paths):
+    """Build the local label index from openFDA drug-label bulk download files."""
+    global _label_index_ready
+    conn = get_db()
+    conn.executescript(LABEL_INDEX_SCHEMA)
+    
+    count = 0
+    with conn:
+        # Each ingest replaces the previous dump
+        conn.execute("DELETE FROM label_names")
+        conn.execute("DELETE FROM labels")
+        conn.execute("INSERT INTO labels_fts (labels_fts) VALUES ('delete-all')")
+        
+        for fp in iter_dump_files(paths):
+            for record in iter_label_records(fp):
+                openfda = record.get("openfda", {})
+                brand_names = [name.lower() for name in openfda.get("brand_name", [])]
+                generic_names = [name.lower() for name in openfda.get("generic_name", [])]
+                interactions = record.get("drug_interactions", [])
+                interactions_text = " ".join(interactions) if isinstance(interactions, list) else interactions
+                if not (brand_names or generic_names or interactions_text):
+                    continue
+                
+                label_id = conn.execute(
+                    "INSERT INTO labels (brand_names, generic_names, drug_interactions) VALUES (?, ?, ?)",
+                    (json.dumps(brand_names), json.dumps(generic_names), interactions_text)
+                ).lastrowid
+                if interactions_text:
+                    conn.execute(
+                        "INSERT INTO labels_fts (rowid, drug_interactions) VALUES (?, ?)",
+                        (label_id, interactions_text)
+                    )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO label_names (name, label_id) VALUES (?, ?)",
+                    [(name, label_id) for name in brand_names + generic_names]
+                )
+                
+                count += 1
+                if count % 10000 == 0:
+                    print(f"   📥 {count} labels ingested...")
+        
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('label_index_ingested', ?)",
+            (datetime.now().isoformat(),)
+        )
+    
+    _label_index_ready = True
+    print(f"\n✓ Ingested {count} drug labels into the local index.\n")
+    return count
+
+def lookup_local_interactions(drug_name, limit=3):
+    """Get interaction texts mentioning a drug (by any of its names) from the local label index."""
+    query = " OR ".join('"' + name.replace('"', '""') + '"' for name in get_search_names(drug_name))
+    rows = get_db().execute(
+        "SELECT labels.drug_interactions FROM labels_fts "
+        "JOIN labels ON labels.id = labels_fts.rowid "
+        "WHERE labels_fts MATCH ? LIMIT ?",
+        (query, limit)
+    ).fetchall()
+    return [row[0] for row in rows]
+
+def lookup_local_suggestions(partial_name, limit=5):
+    """Get drug names starting with a prefix from the local label index."""
+    prefix = partial_name.lower()
+    rows = get_db().execute(
+        "SELECT DISTINCT name FROM label_names WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+        (prefix, prefix + "\uffff", limit)
+    ).fetchall()
+    return [row[0] for row in rows]
 
 # ============================================================================
 # DRUG DATA FETCHING
 # ============================================================================
 
-def get_drug_interactions(drug_name, limit=3):
+def lookup_stored_interactions(drug_name, limit=3, use_cache=True, refresh=False):
+    """Get a drug's interaction data from the local index or label cache, or None to fetch it."""
+    if label_index_ready():
+        with get_metrics().span("local_index_lookup"):
+            results = lookup_local_interactions(drug_name, limit)
+        get_metrics().incr("cache_requests_total", cache="local_index", result="hit" if results else "miss")
+        if results:
+            return results
+    
+    if not LIVE_API_FALLBACK:
+        # Offline: never the live API, so the label cache is all there is, even when refreshing
+        cached = get_cached_label(drug_name) if use_cache else None
+        return cached if cached is not None else ["No interaction data found"]
+    if use_cache and not refresh:
+        return get_cached_label(drug_name)
+    return None
+
+def get_drug_interactions(drug_name, limit=3, use_cache=True, refresh=False):
+    """Get drug interaction data, from the local index, label cache or OpenFDA.
+    
+    refresh skips a cached label but still caches what is fetched.
+    """
+    drug_name = canonicalize_drug_name(drug_name)
+    results = lookup_stored_interactions(drug_name, limit, use_cache, refresh)
+    if results is not None:
+        return results
+    
+    results = fetch_drug_interactions(drug_name, limit)
+    
+    # Only keep real answers; errors are retried on the next check
+    if use_cache and not any(text.startswith("Error:") for text in results):
+        cache_label(drug_name, results)
+    return results
+
+def fetch_drug_interactions(drug_name, limit=3):
     """Fetch drug interaction data from OpenFDA."""
-    params = {"search": f"drug_interactions:{drug_name}", "limit": limit}
+    params = {"search": build_label_search(drug_name), "limit": limit}
     try:
-        response = requests.get(OPENFDA_LABEL_ENDPOINT, params=params, timeout=10)
+        with get_metrics().span("openfda_request"):
+            response = request_with_retries("GET", OPENFDA_LABEL_ENDPOINT, "openfda", params=params, timeout=10)
+        # OpenFDA answers 404 when nothing matches, as in fetch_drug_interactions_bulk
+        if response.status_code == 404:
+            return ["No interaction data found"]
         response.raise_for_status()
         data = response.json()
+        learn_drug_names_from_labels(data.get("results", []))
         results = []
         for entry in data.get("results", []):
             interactions = entry.get("drug_interactions", [])
@@ -86,20 +972,133 @@ def get_drug_interactions(drug_name, limit=3):
                 results.append(interactions_text)
         return results if results else ["No interaction data found"]
     except requests.exceptions.Timeout:
+        get_metrics().incr("http_errors_total", upstream="openfda", kind="timeout")
         return ["Error: Request timed out"]
     except requests.exceptions.RequestException as e:
+        get_metrics().incr("http_errors_total", upstream="openfda", kind=type(e).__name__)
         return [f"Error: {str(e)}"]
 
+def get_drug_interactions_bulk(drug_names, limit=3, use_cache=True):
+    """Get interaction data for many drugs, fetching the rest in a few combined queries.
+    
+    Returns {name: texts} keyed by the names passed in.
+    """
+    # Canonicalize once: aliases learned mid-fetch must not change the keys
+    canonical = {name: canonicalize_drug_name(name) for name in drug_names}
+    results = {}
+    missing = []
+    for drug in dict.fromkeys(canonical.values()):
+        stored = lookup_stored_interactions(drug, limit, use_cache)
+        if stored is None:
+            missing.append(drug)
+        else:
+            results[drug] = stored
+    
+    for start in range(0, len(missing), BULK_QUERY_MAX_DRUGS):
+        fetched = fetch_drug_interactions_bulk(missing[start:start + BULK_QUERY_MAX_DRUGS], limit)
+        for drug, texts in fetched.items():
+            # Only keep real answers; errors are retried on the next check
+            if use_cache and not any(text.startswith("Error:") for text in texts):
+                cache_label(drug, texts)
+        results.update(fetched)
+    return {name: results[drug] for name, drug in canonical.items()}
+
+def fetch_drug_interactions_bulk(drug_names, limit=3):
+    """Fetch several drugs' interaction data from OpenFDA with one OR-combined query.
+    
+    Pages through the matching labels until every drug has limit texts.
+    Each label counts for every drug its interaction text names, which is
+    what the drug's own query would have matched on. Drugs still without
+    a label after BULK_MAX_PAGES pages are fetched individually.
+    """
+    if len(drug_names) == 1:
+        return {drug_names[0]: fetch_drug_interactions(drug_names[0], limit)}
+    
+    found = {drug: [] for drug in drug_names}
+    patterns = {drug: get_search_pattern(drug) for drug in drug_names}
+    page_size = limit * len(drug_names)
+    params = {"search": " ".join(build_label_search(drug) for drug in drug_names), "limit": page_size}
+    exhausted = False
+    try:
+        for page in range(BULK_MAX_PAGES):
+            params["skip"] = page * page_size
+            with get_metrics().span("openfda_request"):
+                response = request_with_retries("GET", OPENFDA_LABEL_ENDPOINT, "openfda", params=params, timeout=15)
+            # OpenFDA answers 404 when nothing (more) matches
+            if response.status_code == 404:
+                exhausted = True
+                break
+            response.raise_for_status()
+            data = response.json()
+            entries = data.get("results", [])
+            learn_drug_names_from_labels(entries)
+            
+            for entry in entries:
+                interactions = entry.get("drug_interactions", [])
+                interactions_text = " ".join(interactions) if isinstance(interactions, list) else interactions
+                if not interactions_text:
+                    continue
+                for drug, pattern in patterns.items():
+                    if len(found[drug]) < limit and pattern.search(interactions_text):
+                        found[drug].append(interactions_text)
+            
+            total = data.get("meta", {}).get("results", {}).get("total", 0)
+            exhausted = not entries or params["skip"] + len(entries) >= total
+            if exhausted or all(len(texts) >= limit for texts in found.values()):
+                break
+    except requests.exceptions.Timeout:
+        get_metrics().incr("http_errors_total", upstream="openfda", kind="timeout")
+        return {drug: ["Error: Request timed out"] for drug in drug_names}
+    except requests.exceptions.RequestException as e:
+        get_metrics().incr("http_errors_total", upstream="openfda", kind=type(e).__name__)
+        return {drug: [f"Error: {str(e)}"] for drug in drug_names}
+    
+    results = {}
+    for drug, texts in found.items():
+        if texts:
+            results[drug] = texts
+        elif exhausted:
+            results[drug] = ["No interaction data found"]
+        else:
+            # Crowded out of the combined results by the other drugs' labels
+            results[drug] = fetch_drug_interactions(drug, limit)
+    return results
+
+def build_label_search(drug_name):
+    """OpenFDA query matching labels whose interaction text names the drug any way."""
+    # Space-separated clauses are OR'ed; multi-word names are quoted as phrases
+    return " ".join(
+        f'drug_interactions:"{name}"' if " " in name else f"drug_interactions:{name}"
+        for name in get_search_names(drug_name)
+    )
+
+def fetch_drug_interactions_concurrently(drug_names):
+    """Fetch interaction data for several drugs at once over the shared pool."""
+    executor = get_fetch_executor()
+    futures = {name: executor.submit(get_drug_interactions, name) for name in dict.fromkeys(drug_names)}
+    return {name: future.result() for name, future in futures.items()}
+
 def search_drug_suggestions(partial_name, limit=5):
-    """Search for drug name suggestions from OpenFDA."""
+    """Search for drug name suggestions from the local index or OpenFDA."""
+    if label_index_ready():
+        suggestions = lookup_local_suggestions(partial_name, limit)
+        if suggestions:
+            return suggestions
+    if not LIVE_API_FALLBACK:
+        return []
+    
     try:
         params = {
             "search": f"openfda.brand_name:{partial_name}*",
             "limit": limit
         }
-        response = requests.get(OPENFDA_LABEL_ENDPOINT, params=params, timeout=5)
+        # Suggestions are interactive, so fail fast rather than retry
+        response = request_with_retries(
+            "GET", OPENFDA_LABEL_ENDPOINT, "openfda", max_retries=0, params=params, timeout=5
+        )
         response.raise_for_status()
         data = response.json()
+        learn_drug_names_from_labels(data.get("results", []))
         
         suggestions = set()
         for entry in data.get("results", []):
@@ -112,144 +1111,797 @@ def search_drug_suggestions(partial_name, limit=5):
     except:
         return []
 
+# ============================================================================
+# DRUG NAME AUTOCOMPLETE
+# ============================================================================
+
+def _edit_keys(text):
+    """Return text plus every single-character deletion of it."""
+    return {text} | {text[:i] + text[i + 1:] for i in range(len(text))}
+
+def _within_one_edit(a, b):
+    """Check whether a and b differ by at most one edit or adjacent swap."""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        # One substitution, or two neighbouring characters swapped
+        return a[i + 1:] == b[i + 1:] or (a[i:i + 2] == b[i:i + 2][::-1] and a[i + 2:] == b[i + 2:])
+    return a[i:] == b[i + 1:]
+
+class DrugNameIndex:
+    """In-memory drug name index for instant prefix and typo-tolerant lookups.
+    
+    Names live in a sorted list searched with bisect. Fuzzy lookups use a
+    deletion index over each name's first FUZZY_KEY_LENGTH characters, so
+    a one-character typo there still finds the name without a full scan.
+    """
+    
+    FUZZY_KEY_LENGTH = 4
+    
+    def __init__(self):
+        self.names = []
+        self.weights = {}
+        self.fuzzy_keys = {}
+        self.lock = threading.Lock()
+    
+    def add(self, name, weight=1):
+        """Add a name, or raise the weight of one already indexed."""
+        name = normalize_drug_name(name)
+        if not name:
+            return
+        with self.lock:
+            if name in self.weights:
+                self.weights[name] += weight
+                return
+            self.weights[name] = weight
+            bisect.insort(self.names, name)
+            for key in _edit_keys(name[:self.FUZZY_KEY_LENGTH]):
+                self.fuzzy_keys.setdefault(key, []).append(name)
+    
+    def _rank(self, name):
+        return (-self.weights[name], len(name), name)
+    
+    def prefix_matches(self, prefix, limit=5, scan_limit=200):
+        """Get indexed names starting with prefix, most common first."""
+        prefix = normalize_drug_name(prefix)
+        start = bisect.bisect_left(self.names, prefix)
+        matches = []
+        for name in self.names[start:start + scan_limit]:
+            if not name.startswith(prefix):
+                break
+            matches.append(name)
+        matches.sort(key=lambda name: (name != prefix,) + self._rank(name))
+        return matches[:limit]
+    
+    def fuzzy_matches(self, query, limit=5):
+        """Get names whose prefix is within one typo of query."""
+        query = normalize_drug_name(query)
+        if len(query) < self.FUZZY_KEY_LENGTH:
+            return []
+        n = len(query)
+        candidates = set()
+        for key in _edit_keys(query[:self.FUZZY_KEY_LENGTH]):
+            candidates.update(self.fuzzy_keys.get(key, ()))
+        matches = [
+            name for name in candidates
+            if any(_within_one_edit(query, name[:k]) for k in (n, n - 1, n + 1))
+        ]
+        matches.sort(key=self._rank)
+        return matches[:limit]
+    
+    def complete(self, partial_name, limit=5):
+        """Get ranked prefix matches, topped up with fuzzy matches."""
+        matches = self.prefix_matches(partial_name, limit)
+        if len(matches) < limit:
+            matches += [m for m in self.fuzzy_matches(partial_name, limit) if m not in matches]
+        return matches[:limit]
+
+_name_index = None
+_name_index_lock = threading.Lock()
+
+def load_bundled_drug_names():
+    """Count drug name occurrences in the bundled alias and DDInter assets."""
+    counts = {}
+    try:
+        with open(DRUG_ALIASES_FILE) as f:
+            for canonical, aliases in json.load(f).items():
+                for name in [canonical] + aliases:
+                    counts[name.lower()] = counts.get(name.lower(), 0) + 1
+    except (OSError, ValueError):
+        pass
+    
+    for csv_path in sorted(ASSETS_DIR.glob(DDINTER_CSV_PATTERN)):
+        with open(csv_path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if "Drug_A" not in header or "Drug_B" not in header:
+                continue
+            columns = (header.index("Drug_A"), header.index("Drug_B"))
+            for row in reader:
+                if len(row) <= max(columns):
+                    continue
+                for column in columns:
+                    name = row[column].lower()
+                    counts[name] = counts.get(name, 0) + 1
+    return counts
+
+def get_name_index():
+    """Get the autocomplete index, building it on first use."""
+    global _name_index
+    if _name_index is None:
+        with _name_index_lock:
+            if _name_index is None:
+                index = DrugNameIndex()
+                for name, count in load_bundled_drug_names().items():
+                    index.add(name, count)
+                for row in get_db().execute("SELECT name, seen FROM drug_names"):
+                    index.add(row['name'], row['seen'])
+                if label_index_ready():
+                    for row in get_db().execute("SELECT DISTINCT name FROM label_names"):
+                        index.add(row['name'])
+                _name_index = index
+    return _name_index
+
+def learn_drug_names(names):
+    """Remember drug names seen in OpenFDA responses for future autocomplete."""
+    names = [normalize_drug_name(name) for name in names if name and name.strip()]
+    if not names:
+        return
+    with get_db() as conn:
+        conn.executemany(
+            "INSERT INTO drug_names (name) VALUES (?) ON CONFLICT(name) DO UPDATE SET seen = seen + 1",
+            [(name,) for name in names]
+        )
+    if _name_index is not None:
+        for name in names:
+            _name_index.add(name)
+
+def learn_drug_names_from_labels(entries):
+    """Learn the brand and generic names of OpenFDA label results."""
+    names = set()
+    for entry in entries:
+        openfda = entry.get("openfda", {})
+        names.update(openfda.get("brand_name", []))
+        names.update(openfda.get("generic_name", []))
+    try:
+        learn_drug_names(names)
+        learn_drug_aliases(entries)
+    except sqlite3.Error:
+        pass
+
+def autocomplete_drug_names(partial_name, limit=5):
+    """Suggest drug names for partial input from the local index."""
+    return get_name_index().complete(partial_name, limit)
+
+# ============================================================================
+# DRUG NAME CANONICALIZATION
+# ============================================================================
+
+_alias_map = None
+_alias_rowid = 0
+_alias_checked = 0.0
+_alias_lock = threading.Lock()
+
+def strip_salt(name):
+    """Drop trailing salt words from a drug name ("warfarin sodium" -> "warfarin")."""
+    words = name.split()
+    while len(words) > 1 and words[-1] in SALT_WORDS:
+        words.pop()
+    return " ".join(words)
+
+def load_bundled_aliases():
+    """Map every name in the bundled alias file to its canonical name."""
+    aliases = {}
+    try:
+        with open(DRUG_ALIASES_FILE) as f:
+            for canonical, names in json.load(f).items():
+                canonical = normalize_drug_name(canonical)
+                for name in [canonical] + names:
+                    aliases[normalize_drug_name(name)] = canonical
+    except (OSError, ValueError):
+        pass
+    return aliases
+
+def get_alias_map():
+    """Get the alias -> canonical name map (bundled aliases win over learned ones).
+    
+    Aliases other workers learn are merged in, checking at most every
+    ALIAS_REFRESH_SECONDS.
+    """
+    global _alias_map, _alias_rowid, _alias_checked
+    if _alias_map is None or time.monotonic() - _alias_checked > ALIAS_REFRESH_SECONDS:
+        with _alias_lock:
+            if _alias_map is None:
+                _alias_map = load_bundled_aliases()
+                _alias_rowid = 0
+            rows = get_db().execute(
+                "SELECT rowid, alias, canonical FROM drug_aliases WHERE rowid > ? ORDER BY rowid", (_alias_rowid,)
+            ).fetchall()
+            for row in rows:
+                _alias_map.setdefault(row['alias'], row['canonical'])
+                _alias_rowid = row['rowid']
+            _alias_checked = time.monotonic()
+    return _alias_map
+
+def canonicalize_drug_name(drug_name):
+    """Map a brand name, salt form or alias to the canonical generic name."""
+    name = normalize_drug_name(drug_name)
+    aliases = get_alias_map()
+    return aliases.get(name) or aliases.get(strip_salt(name)) or name
+
+def learn_drug_aliases(entries):
+    """Learn brand and salt-form -> generic aliases from OpenFDA label results."""
+    learned = {}
+    for entry in entries:
+        openfda = entry.get("openfda", {})
+        generics = {normalize_drug_name(name) for name in openfda.get("generic_name", [])}
+        # Labels listing several generics don't say which one a brand is
+        if len(generics) != 1:
+            continue
+        generic = generics.pop()
+        canonical = canonicalize_drug_name(generic)
+        if canonical == generic:
+            canonical = strip_salt(generic)
+        for name in {generic} | {normalize_drug_name(name) for name in openfda.get("brand_name", [])}:
+            if name != canonical:
+                learned.setdefault(name, canonical)
+    
+    aliases = get_alias_map()
+    new = [(alias, canonical) for alias, canonical in learned.items() if alias not in aliases]
+    if not new:
+        return
+    with get_db() as conn:
+        conn.executemany("INSERT OR IGNORE INTO drug_aliases (alias, canonical) VALUES (?, ?)", new)
+    with _alias_lock:
+        for alias, canonical in new:
+            aliases.setdefault(alias, canonical)
+
+@functools.lru_cache(maxsize=1024)
+def get_search_pattern(drug_name):
+    """Compile a whole-word matcher for the names a label search uses for a drug."""
+    names = sorted(get_search_names(drug_name), key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(re.escape(name) for name in names) + r")\b", re.IGNORECASE)
+
+def get_search_names(drug_name):
+    """Names to search label text for: the canonical name, then its bundled aliases."""
+    canonical = canonicalize_drug_name(drug_name)
+    # Very short aliases ("asa") match unrelated words
+    aliases = sorted(name for name in get_alias_groups().get(canonical, ()) if name != canonical and len(name) > 3)
+    return [canonical] + aliases
+
+# ============================================================================
+# LABEL EXCERPTS
+# ============================================================================
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\[])")
+
+def split_sentences(text):
+    """Split label text into sentences."""
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+@functools.lru_cache(maxsize=1)
+def get_alias_groups():
+    """Map each bundled drug name to every name in its alias group."""
+    groups = {}
+    try:
+        with open(DRUG_ALIASES_FILE) as f:
+            for canonical, aliases in json.load(f).items():
+                group = {name.lower() for name in [canonical] + aliases}
+                for name in group:
+                    groups.setdefault(name, set()).update(group)
+    except (OSError, ValueError):
+        pass
+    return groups
+
+def get_drug_terms(drug_name):
+    """Names a label may use for a drug: itself, its base name, aliases and classes."""
+    name = normalize_drug_name(drug_name)
+    terms = {name, " ".join(w for w in name.split() if w not in SALT_WORDS) or name}
+    for term in list(terms):
+        terms.update(get_alias_groups().get(term, ()))
+    terms.update(cls for cls, members in DRUG_CLASSES.items() if terms & set(members))
+    return terms
+
+@functools.lru_cache(maxsize=1024)
+def get_mention_pattern(drug_name):
+    """Compile a whole-word matcher for any term naming the drug."""
+    terms = sorted(get_drug_terms(drug_name), key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(re.escape(t) for t in terms) + r")s?\b", re.IGNORECASE)
+
+def extract_mentions(texts, drug_name):
+    """Get the distinct sentences of texts that mention a drug."""
+    pattern = get_mention_pattern(drug_name)
+    sentences = (sentence for text in texts for sentence in split_sentences(text))
+    return list(dict.fromkeys(sentence for sentence in sentences if pattern.search(sentence)))
+
+def select_pair_text(drug1, drug2, drug1_texts, drug2_texts):
+    """Reduce both drugs' label texts to the excerpts relevant to this pair.
+    
+    Keeps only sentences that mention the partner drug (by name, alias or
+    class), and returns "" when none do: the rest of the texts is about
+    other drugs and says nothing about this pair.
+    """
+    excerpts = extract_mentions(drug1_texts, drug2) + extract_mentions(drug2_texts, drug1)
+    return " ".join(dict.fromkeys(excerpts))
+
 # ============================================================================
 # SEVERITY DETECTION
 # ============================================================================
 
+def _keyword_pattern(keyword):
+    """Build a whole-word pattern for a keyword that also accepts simple inflections."""
+    if keyword.endswith("e"):
+        # reduce -> reduces/reduced/reducing, severe -> severely
+        stem, suffix = keyword[:-1], r"(?:e|es|ed|ing|ely)"
+    else:
+        # avoid -> avoids/avoided, monitor -> monitoring, fatal -> fatally
+        stem, suffix = keyword, r"(?:s|es|ed|ing|ly)?"
+    return stem, re.compile(re.escape(stem) + suffix + r"\b")
+
+def compile_severity_matchers(red_keywords, yellow_keywords):
+    """Precompile (stem, keyword, level, pattern) matchers, high severity first.
+    
+    Scanning uses str.find on the stem, which runs at C speed, and the
+    compiled pattern only checks word boundaries and inflections at each
+    hit. A single combined regex was measured several times slower than
+    this on real label sizes (see benchmarks/bench_severity.py).
+    """
+    matchers = []
+    for keywords, level in ((red_keywords, "red"), (yellow_keywords, "yellow")):
+        for keyword in keywords:
+            stem, pattern = _keyword_pattern(keyword)
+            matchers.append((stem, keyword, level, pattern))
+    return matchers
+
+SEVERITY_MATCHERS = compile_severity_matchers(RED_KEYWORDS, YELLOW_KEYWORDS)
+
+def _iter_keyword_hits(text_lower, stem, pattern):
+    """Yield (start, end) of whole-word matches of one keyword."""
+    start = text_lower.find(stem)
+    while start != -1:
+        # "avoid" must not match inside "avoidance", "risk" not inside "asterisk"
+        if start == 0 or not text_lower[start - 1].isalnum():
+            match = pattern.match(text_lower, start)
+            if match:
+                yield start, match.end()
+        start = text_lower.find(stem, start + 1)
+
+def find_severity_keywords(text):
+    """Find every severity keyword in text as (keyword, level, start, end) tuples."""
+    text_lower = text.lower()
+    matches = []
+    for stem, keyword, level, pattern in SEVERITY_MATCHERS:
+        for start, end in _iter_keyword_hits(text_lower, stem, pattern):
+            matches.append((keyword, level, start, end))
+    matches.sort(key=lambda m: m[2])
+    return matches
+
 def detect_severity(text):
     """Detect interaction severity based on keywords."""
     text_lower = text.lower()
     
-    # Check for high severity
-    if any(keyword in text_lower for keyword in RED_KEYWORDS):
-        return "🔴 High"
-    
-    # Check for moderate severity
-    elif any(keyword in text_lower for keyword in YELLOW_KEYWORDS):
-        return "🟡 Moderate"
+    # Matchers are ordered high severity first, so the first hit decides
+    for stem, keyword, level, pattern in SEVERITY_MATCHERS:
+        if next(_iter_keyword_hits(text_lower, stem, pattern), None):
+            return "🔴 High" if level == "red" else "🟡 Moderate"
     
     # Default to low if data exists but no keywords found
     return "🟢 Low"
 
+def detect_severity_batch(texts):
+    """Detect severity for many interaction texts at once."""
+    return [detect_severity(text) for text in texts]
+
 # ============================================================================
 # AI SUMMARIZATION
 # ============================================================================
 
-def summarize_with_ollama(raw_text, drug1, drug2):
-    """Use Ollama locally to generate patient-friendly summary."""
-    
-    # Check if raw_text indicates no data
-    if "No interaction data" in raw_text or "Error:" in raw_text:
-        return raw_text
-    
-    prompt = f"""Read this FDA data about {drug1} and {drug2}. Write ONLY 2-3 short sentences explaining the interaction risk to a patient. Do not include any introduction, greeting, or extra text.
+OLLAMA_OPTIONS = {
+    "temperature": 0.2,
+    "num_predict": 100,
+    "stop": ["\n\n", "Note:", "Important:", "Disclaimer:"]
+}
+SUMMARY_MAX_SENTENCES = 3
+
+# Extractive summaries quote the label's own sentences, marked with this prefix
+EXTRACTIVE_PREFIX = "📄 From the label: "
+EXTRACTIVE_MAX_SENTENCES = 2
+EXTRACTIVE_MAX_SENTENCE_CHARS = 240
+
+def build_summary_prompt(raw_text, drug1, drug2):
+    """Build the Ollama prompt for a pair's FDA interaction text."""
+    return f"""Read this FDA data about {drug1} and {drug2}. Write ONLY 2-3 short sentences explaining the interaction risk to a patient. Do not include any introduction, greeting, or extra text.
 
 FDA Data:
 {raw_text[:1500]}
 
 Patient summary (2-3 sentences only):"""
 
+def get_cleanup_phrases(drug1, drug2):
+    """Common chatty patterns stripped from model output."""
+    return [
+        "Here's a summary", "Here is a summary", "In plain English:",
+        "For you:", "Patient summary:", f"between {drug1} and {drug2}",
+        "of the FDA drug interaction data", "FDA data shows", "According to"
+    ]
+
+def clean_summary(summary, drug1, drug2):
+    """Strip chatty phrases and extra whitespace, and keep at most three sentences."""
+    for phrase in get_cleanup_phrases(drug1, drug2):
+        summary = summary.replace(phrase, "")
+    
+    # Remove extra whitespace
+    summary = " ".join(summary.split())
+    
+    # Limit to 3 sentences
+    sentences = summary.split('. ')
+    if len(sentences) > SUMMARY_MAX_SENTENCES:
+        summary = '. '.join(sentences[:SUMMARY_MAX_SENTENCES]) + '.'
+    
+    return summary.strip()
+
+def summarize_with_ollama(raw_text, drug1, drug2, on_text=None):
+    """Use Ollama locally to generate patient-friendly summary.
+    
+    The completion is streamed. Cleanup runs on the text received so far,
+    text that can no longer change is passed to on_text as it arrives, and
+    generation is cut off once three sentences are complete.
+    """
+    
+    # Check if raw_text indicates no data
+    if "No interaction data" in raw_text or "Error:" in raw_text:
+        return raw_text
+    
+    prompt = build_summary_prompt(raw_text, drug1, drug2)
+    summary_key = get_summary_key(prompt)
+    cached = get_cached_summary(summary_key)
+    if cached:
+        if on_text:
+            on_text(cached)
+        return cached
+    
+    payload = {
+        "model": OLLAMA_MODEL,
+        "prompt": prompt,
+        "stream": True,
+        "options": OLLAMA_OPTIONS,
+        "keep_alive": OLLAMA_KEEP_ALIVE
+    }
+    # A cleanup phrase may still be forming in this many trailing characters
+    holdback = max(len(phrase) for phrase in get_cleanup_phrases(drug1, drug2))
+    
     try:
-        payload = {
-            "model": OLLAMA_MODEL,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.2,
-                "num_predict": 100,
-                "stop": ["\n\n", "Note:", "Important:", "Disclaimer:"]
-            }
-        }
-        
-        response = requests.post(OLLAMA_API, json=payload, timeout=60)
-        response.raise_for_status()
-        
-        result = response.json()
-        summary = result['response'].strip()
-        
-        # Clean up common chatty patterns
-        cleanup_phrases = [
-            "Here's a summary", "Here is a summary", "In plain English:",
-            "For you:", "Patient summary:", f"between {drug1} and {drug2}",
-            "of the FDA drug interaction data", "FDA data shows", "According to"
-        ]
-        
-        for phrase in cleanup_phrases:
-            summary = summary.replace(phrase, "")
-        
-        # Remove extra whitespace
-        summary = " ".join(summary.split())
+        generated = ""
+        summary = ""
+        emitted = ""
+        # Retry a failed connect once, but never a slow generation: that would double the wait
+        with get_metrics().span("ollama_generate"), request_with_retries(
+            "POST", OLLAMA_API, "ollama", max_retries=1, retry_read_timeouts=False,
+            json=payload, timeout=(3.05, 60), stream=True
+        ) as response:
+            response.raise_for_status()
+            
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                generated += chunk.get("response", "")
+                if chunk.get("eval_duration"):
+                    # Only the final chunk carries these; a stream cut off early has none
+                    get_metrics().incr("ollama_eval_tokens_total", chunk.get("eval_count", 0))
+                    get_metrics().incr("ollama_eval_seconds_total", chunk["eval_duration"] / 1e9)
+                summary = clean_summary(generated, drug1, drug2)
+                
+                # Closing the stream early makes Ollama stop generating
+                finished = chunk.get("done") or len(summary.split('. ')) > SUMMARY_MAX_SENTENCES
+                if on_text:
+                    stable = summary if finished else summary[:len(summary) - holdback]
+                    if len(stable) > len(emitted) and stable.startswith(emitted):
+                        on_text(stable[len(emitted):])
+                        emitted = stable
+                if finished:
+                    break
         
-        # Limit to 3 sentences
-        sentences = summary.split('. ')
-        if len(sentences) > 3:
-            summary = '. '.join(sentences[:3]) + '.'
+        summary = clean_summary(generated, drug1, drug2)
+        if on_text and summary.startswith(emitted) and summary != emitted:
+            on_text(summary[len(emitted):])
         
-        return summary.strip() if summary.strip() else raw_text[:200]
+        if not summary:
+            return raw_text[:200]
+        cache_summary(summary_key, summary)
+        return summary
     
     except requests.exceptions.ConnectionError:
+        get_metrics().incr("http_errors_total", upstream="ollama", kind="ConnectionError")
         return "⚠️ Ollama not running. Please start Ollama service."
     except requests.exceptions.Timeout:
+        get_metrics().incr("http_errors_total", upstream="ollama", kind="timeout")
         return "⚠️ AI summary timed out. Using raw data."
     except Exception as e:
         return f"⚠️ AI error: {str(e)}"
 
+def extractive_summary(raw_text, drug1, drug2):
+    """Summarize by quoting the label sentences that best describe the pair's risk.
+    
+    Sentences naming both drugs rank above those naming one, then more
+    severe keywords rank higher; the winners keep their label order.
+    """
+    if "No interaction data" in raw_text or "Error:" in raw_text:
+        return raw_text
+    sentences = split_sentences(raw_text)
+    if not sentences:
+        return raw_text[:200]
+    patterns = (get_mention_pattern(drug1), get_mention_pattern(drug2))
+    
+    def score(sentence):
+        mentions = sum(1 for pattern in patterns if pattern.search(sentence))
+        severity = sum(3 if level == "red" else 1 for _, level, _, _ in find_severity_keywords(sentence))
+        return mentions * 10 + severity
+    
+    ranked = sorted(range(len(sentences)), key=lambda i: -score(sentences[i]))[:EXTRACTIVE_MAX_SENTENCES]
+    quoted = []
+    for i in sorted(ranked):
+        sentence = sentences[i]
+        if len(sentence) > EXTRACTIVE_MAX_SENTENCE_CHARS:
+            sentence = sentence[:EXTRACTIVE_MAX_SENTENCE_CHARS].rsplit(" ", 1)[0] + "…"
+        quoted.append(sentence)
+    return EXTRACTIVE_PREFIX + " ".join(quoted)
+
+def summarize_with_deadline(raw_text, drug1, drug2, deadline=None, on_text=None, on_upgrade=None):
+    """Summarize with Ollama if it finishes within deadline seconds, else extractively.
+    
+    Ollama runs on the summary pool. Past the deadline (or if it fails) the
+    extractive summary is returned at once and on_text stops receiving
+    text. A summary Ollama is already generating is still memoized when it
+    finishes and passed to on_upgrade; one still queued is cancelled, so
+    abandoned jobs can't pile up behind the pool. deadline None waits for
+    Ollama as long as it takes.
+    """
+    if deadline is None:
+        return summarize_with_ollama(raw_text, drug1, drug2, on_text)
+    
+    expired = threading.Event()
+    forward_lock = threading.Lock()
+    
+    def forward(text):
+        with forward_lock:
+            if not expired.is_set():
+                on_text(text)
+    
+    future = get_summary_executor().submit(
+        summarize_with_ollama, raw_text, drug1, drug2, forward if on_text else None
+    )
+    try:
+        summary = future.result(timeout=max(0.0, deadline))
+        if not summary.startswith("⚠️"):
+            return summary
+    except FutureTimeoutError:
+        with forward_lock:
+            expired.set()
+        get_metrics().incr("summary_deadline_missed_total")
+        if future.cancel():
+            get_metrics().incr("summary_cancelled_total")
+        elif on_upgrade:
+            def upgrade(done):
+                summary = done.result() if not done.exception() else ""
+                if summary and not summary.startswith("⚠️"):
+                    on_upgrade(summary)
+            future.add_done_callback(upgrade)
+    return extractive_summary(raw_text, drug1, drug2)
+
 # ============================================================================
 # CACHING
 # ============================================================================
 
 def get_cache_key(drug1, drug2):
-    """Generate cache key from two drug names."""
-    return "-".join(sorted([drug1.lower(), drug2.lower()]))
+    """Generate cache key from two drug names, so every alias of a pair shares one entry."""
+    return "-".join(sorted([canonicalize_drug_name(drug1), canonicalize_drug_name(drug2)]))
 
-def get_cached_result(drug1, drug2):
-    """Get cached interaction result if available."""
-    cache = load_json(CACHE_FILE)
+def get_cached_result(drug1, drug2, refresh_stale=True):
+    """Get cached interaction result if available.
+    
+    Entries past their TTL are still returned, with 'stale' set, and a
+    background refresh is scheduled so later checks see updated labels.
+    Expired provisional results are treated as missing and recomputed.
+    """
     key = get_cache_key(drug1, drug2)
-    return cache.get(key)
+    now = time.time()
+    row = get_read_cache().get(("pair", key), lambda: load_cached_result(key))
+    if not row:
+        get_metrics().incr("cache_requests_total", cache="pair", result="miss")
+        return None
+    if now - row['last_used'] > LRU_TOUCH_INTERVAL_SECONDS:
+        row['last_used'] = now
+        with get_db() as conn:
+            conn.execute("UPDATE pair_cache SET last_used = ? WHERE key = ?", (now, key))
+    
+    result = dict(row, stale=row['expires'] <= now)
+    if result['stale'] and is_provisional_result(result['severity'], result['summary']):
+        get_metrics().incr("cache_requests_total", cache="pair", result="miss")
+        return None
+    get_metrics().incr("cache_requests_total", cache="pair", result="stale" if result['stale'] else "hit")
+    if result['stale'] and refresh_stale:
+        schedule_pair_refresh(drug1, drug2)
+    return result
+
+def load_cached_result(key):
+    """Read a pair_cache row as a dict, or None."""
+    row = get_db().execute(
+        "SELECT severity, summary, timestamp, expires, last_used FROM pair_cache WHERE key = ?", (key,)
+    ).fetchone()
+    return dict(row) if row else None
 
-def cache_result(drug1, drug2, severity, summary):
-    """Cache interaction result for faster future lookups."""
-    cache = load_json(CACHE_FILE)
+def cache_result(drug1, drug2, severity, summary, ttl=None):
+    """Cache interaction result for faster future lookups.
+    
+    The entry expires after ttl seconds (by default PAIR_CACHE_TTL_SECONDS,
+    or NEGATIVE_CACHE_TTL_SECONDS for provisional results); least recently
+    used entries are evicted beyond PAIR_CACHE_MAX_ENTRIES.
+    """
     key = get_cache_key(drug1, drug2)
-    cache[key] = {
-        "severity": severity,
-        "summary": summary,
-        "timestamp": datetime.now().isoformat()
-    }
-    save_json(CACHE_FILE, cache)
+    now = time.time()
+    if ttl is None:
+        ttl = NEGATIVE_CACHE_TTL_SECONDS if is_provisional_result(severity, summary) else PAIR_CACHE_TTL_SECONDS
+    with get_db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO pair_cache (key, severity, summary, timestamp, expires, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, severity, summary, datetime.now().isoformat(), now + ttl, now)
+        )
+        excess = conn.execute("SELECT COUNT(*) FROM pair_cache").fetchone()[0] - PAIR_CACHE_MAX_ENTRIES
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM pair_cache WHERE key IN "
+                "(SELECT key FROM pair_cache ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+def is_negative_result(severity, summary):
+    """Whether a result reflects a failed lookup or summary rather than a real answer."""
+    return severity == "⚪ Unknown" or summary.startswith("⚠️")
+
+def is_provisional_result(severity, summary):
+    """Whether a result should soon be replaced: negative, or an extractive stand-in."""
+    return is_negative_result(severity, summary) or summary.startswith(EXTRACTIVE_PREFIX)
+
+_refreshing_pairs = set()
+_refresh_lock = threading.Lock()
+
+def schedule_pair_refresh(drug1, drug2):
+    """Queue a background re-check of an expired pair, once per pair at a time."""
+    key = get_cache_key(drug1, drug2)
+    with _refresh_lock:
+        if key in _refreshing_pairs:
+            return
+        _refreshing_pairs.add(key)
+    get_background_executor().submit(refresh_pair, drug1, drug2)
+
+def refresh_pair(drug1, drug2):
+    """Re-fetch both labels and re-analyze a pair, replacing its cache entry."""
+    try:
+        labels = {name: get_drug_interactions(name, refresh=True) for name in (drug1, drug2)}
+        severity, summary = analyze_interaction(drug1, drug2, labels[drug1], labels[drug2])
+        # Keep serving the stale answer rather than replace it with a failed lookup
+        if not is_negative_result(severity, summary):
+            cache_result(drug1, drug2, severity, summary)
+    finally:
+        with _refresh_lock:
+            _refreshing_pairs.discard(get_cache_key(drug1, drug2))
+
+def normalize_drug_name(drug_name):
+    """Normalize a drug name for use as a cache key."""
+    return " ".join(drug_name.lower().split())
+
+def get_cached_label(drug_name):
+    """Get a drug's cached interaction texts if still within the TTL."""
+    drug = normalize_drug_name(drug_name)
+    
+    def load():
+        row = get_db().execute("SELECT texts, timestamp FROM label_cache WHERE drug = ?", (drug,)).fetchone()
+        return (json.loads(row['texts']), datetime.fromisoformat(row['timestamp'])) if row else None
+    
+    entry = get_read_cache().get(("label", drug), load)
+    fresh = entry and datetime.now() - entry[1] <= timedelta(seconds=LABEL_CACHE_TTL_SECONDS)
+    get_metrics().incr("cache_requests_total", cache="label", result="hit" if fresh else "miss")
+    return list(entry[0]) if fresh else None
+
+def cache_label(drug_name, texts):
+    """Cache a drug's interaction texts so new pairs need no network I/O."""
+    with get_db() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO label_cache (drug, texts, timestamp) VALUES (?, ?, ?)",
+            (normalize_drug_name(drug_name), json.dumps(texts), datetime.now().isoformat())
+        )
+
+def get_summary_key(prompt):
+    """Hash everything an Ollama summary depends on into a cache key."""
+    material = json.dumps({"prompt": prompt, "model": OLLAMA_MODEL, "options": OLLAMA_OPTIONS}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def get_cached_summary(key):
+    """Get a memoized Ollama summary and mark it as recently used."""
+    try:
+        with get_db() as conn:
+            row = conn.execute("SELECT summary FROM summary_cache WHERE hash = ?", (key,)).fetchone()
+            if row:
+                conn.execute("UPDATE summary_cache SET last_used = ? WHERE hash = ?", (time.time(), key))
+    except sqlite3.Error:
+        return None
+    get_metrics().incr("cache_requests_total", cache="summary", result="hit" if row else "miss")
+    return row['summary'] if row else None
+
+def cache_summary(key, summary):
+    """Memoize an Ollama summary, evicting the least recently used over the cap."""
+    try:
+        with get_db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summary_cache (hash, summary, last_used) VALUES (?, ?, ?)",
+                (key, summary, time.time())
+            )
+            excess = conn.execute("SELECT COUNT(*) FROM summary_cache").fetchone()[0] - SUMMARY_CACHE_MAX_ENTRIES
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM summary_cache WHERE hash IN "
+                    "(SELECT hash FROM summary_cache ORDER BY last_used LIMIT ?)",
+                    (excess,)
+                )
+    except sqlite3.Error:
+        pass
 
 # ============================================================================
 # HISTORY TRACKING
 # ============================================================================
 
+_history_inserts = 0
+
 def add_to_history(drug1, drug2, severity, summary):
     """Add check to history."""
-    history = load_json(HISTORY_FILE)
-    history.append({
-        "drug1": drug1,
-        "drug2": drug2,
-        "severity": severity,
-        "summary": summary,
-        "timestamp": datetime.now().isoformat()
-    })
-    # Keep only last 100 entries
-    if len(history) > 100:
-        history = history[-100:]
-    save_json(HISTORY_FILE, history)
+    global _history_inserts
+    with get_db() as conn:
+        conn.execute(
+            "INSERT INTO history (drug1, drug2, severity, summary, timestamp) VALUES (?, ?, ?, ?, ?)",
+            (drug1, drug2, severity, summary, datetime.now().isoformat())
+        )
+    
+    # Appends stay O(1); trimming to the retention limit happens off the request path
+    _history_inserts += 1
+    if HISTORY_RETENTION is not None and _history_inserts % HISTORY_COMPACT_EVERY == 0:
+        get_background_executor().submit(compact_history)
+
+def compact_history(retention=None):
+    """Drop history entries beyond the retention limit."""
+    retention = HISTORY_RETENTION if retention is None else retention
+    if retention is None:
+        return
+    try:
+        with get_db() as conn:
+            conn.execute(
+                "DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?", (retention,)
+            )
+    except sqlite3.Error:
+        pass
 
 def show_history(limit=10):
     """Display recent check history."""
-    history = load_json(HISTORY_FILE)
+    history = get_db().execute(
+        "SELECT * FROM history ORDER BY id DESC LIMIT ?", (limit,)
+    ).fetchall()
     
     if not history:
         print("\n📜 No history yet.\n")
         return
     
-    print(f"\n📜 Recent Checks (last {min(limit, len(history))}):")
+    print(f"\n📜 Recent Checks (last {len(history)}):")
     print("=" * 70)
     
-    for entry in reversed(history[-limit:]):
+    for entry in history:
         timestamp = datetime.fromisoformat(entry['timestamp']).strftime("%Y-%m-%d %H:%M")
         print(f"\n[{timestamp}] {entry['drug1']} + {entry['drug2']}")
         print(f"   {entry['severity']}: {entry['summary'][:80]}...")
@@ -260,37 +1912,61 @@ def show_history(limit=10):
 
 def get_my_medications():
     """Get saved medication list."""
-    return load_json(MY_MEDS_FILE)
+    rows = get_db().execute("SELECT name FROM medications ORDER BY id").fetchall()
+    return [row['name'] for row in rows]
 
 def add_medication(drug_name):
     """Add medication to saved list."""
-    meds = get_my_medications()
     drug_clean = drug_name.lower().strip()
     
-    if drug_clean in meds:
+    try:
+        with get_db() as conn:
+            added = conn.execute(
+                "INSERT OR IGNORE INTO medications (name) VALUES (?)", (drug_clean,)
+            ).rowcount
+    except sqlite3.Error as e:
+        print(f"⚠️ Error saving medication: {e}")
+        return False
+    
+    if not added:
         print(f"\n✓ {drug_name} is already in your medication list.")
         return False
     
-    meds.append(drug_clean)
-    if save_json(MY_MEDS_FILE, meds):
-        print(f"\n✓ Added {drug_name} to your medication list.")
-        return True
-    return False
+    print(f"\n✓ Added {drug_name} to your medication list.")
+    
+    # Only the new drug's row of the regimen matrix needs computing; do it
+    # in the background so the menu doesn't wait on Ollama, and keep these
+    # checks the user didn't ask for out of history
+    get_background_executor().submit(update_regimen_matrix, show_progress=False, record_history=False)
+    return True
 
 def remove_medication(drug_name):
     """Remove medication from saved list."""
-    meds = get_my_medications()
     drug_clean = drug_name.lower().strip()
     
-    if drug_clean not in meds:
+    try:
+        with get_db() as conn:
+            removed = conn.execute(
+                "DELETE FROM medications WHERE name = ?", (drug_clean,)
+            ).rowcount
+            # Drop the drug's row of the regimen matrix, unless another saved
+            # name for the same drug (e.g. advil and ibuprofen) still needs it
+            canonical = canonicalize_drug_name(drug_clean)
+            remaining = {canonicalize_drug_name(name) for name in get_my_medications()}
+            if removed and canonical not in remaining:
+                conn.execute(
+                    "DELETE FROM regimen_matrix WHERE drug1 = ? OR drug2 = ?", (canonical, canonical)
+                )
+    except sqlite3.Error as e:
+        print(f"⚠️ Error saving medication: {e}")
+        return False
+    
+    if not removed:
         print(f"\n⚠️ {drug_name} is not in your medication list.")
         return False
     
-    meds.remove(drug_clean)
-    if save_json(MY_MEDS_FILE, meds):
-        print(f"\n✓ Removed {drug_name} from your medication list.")
-        return True
-    return False
+    print(f"\n✓ Removed {drug_name} from your medication list.")
+    return True
 
 def show_my_medications():
     """Display saved medication list."""
@@ -306,7 +1982,7 @@ def show_my_medications():
         print(f"{i}. {med.title()}")
     print()
 
-def check_against_my_meds(new_drug):
+def check_against_my_meds(new_drug, max_concurrency=None):
     """Check a new drug against all saved medications."""
     meds = get_my_medications()
     
@@ -316,52 +1992,31 @@ def check_against_my_meds(new_drug):
     
     print(f"\n🔍 Checking {new_drug} against {len(meds)} saved medication(s)...\n")
     
-    results = []
-    for med in meds:
-        result = check_interaction(med, new_drug, show_progress=False)
-        results.append(result)
-    
-    # Display all results
-    for result in results:
-        print(result)
+    # Print each row as soon as its pair is ready
+    for med, severity, summary in check_drug_against_many(
+        new_drug, meds, max_concurrency, deadline=SUMMARY_DEADLINE_SECONDS
+    ):
+        print(build_result_table(med, new_drug, severity, summary))
         print()
 
 # ============================================================================
 # INTERACTION CHECKING
 # ============================================================================
 
-def check_interaction(drug1, drug2, show_progress=True, use_cache=True):
-    """Main function to check drug interactions."""
-    drug1 = drug1.lower().strip()
-    drug2 = drug2.lower().strip()
-    
-    if show_progress:
-        print(f"\n🔍 Checking: {drug1.title()} + {drug2.title()}")
-    
-    # Check cache first
-    if use_cache:
-        cached = get_cached_result(drug1, drug2)
-        if cached:
-            if show_progress:
-                print("   ⚡ Using cached result...")
-            
-            table = PrettyTable()
-            table.field_names = ["Drug A", "Drug B", "Severity", "Summary"]
-            table.max_width["Summary"] = 60
-            table.add_row([drug1.title(), drug2.title(), cached['severity'], cached['summary']])
-            
-            add_to_history(drug1, drug2, cached['severity'], cached['summary'])
-            return table
-    
-    # Fetch fresh data
-    if show_progress:
-        print(f"   📡 Fetching {drug1} data...")
-    drug1_texts = get_drug_interactions(drug1)
-    
-    if show_progress:
-        print(f"   📡 Fetching {drug2} data...")
-    drug2_texts = get_drug_interactions(drug2)
+def build_result_table(drug1, drug2, severity, summary):
+    """Create the result table shown for a checked pair."""
+    table = PrettyTable()
+    table.field_names = ["Drug A", "Drug B", "Severity", "Summary"]
+    table.max_width["Summary"] = 60
+    table.add_row([drug1.title(), drug2.title(), severity, summary])
+    return table
+
+def analyze_interaction(drug1, drug2, drug1_texts, drug2_texts, show_progress=False, deadline=None):
+    """Turn both drugs' fetched label texts into (severity, summary).
     
+    With a deadline (seconds), an AI summary not ready in time is replaced
+    by an extractive one, and cached for the pair once it arrives.
+    """
     combined = " ".join(drug1_texts + drug2_texts)
     
     # Check for errors or no data
@@ -369,27 +2024,400 @@ def check_interaction(drug1, drug2, show_progress=True, use_cache=True):
         severity = "⚪ Unknown"
         summary = "No interaction data available in FDA database. Consult healthcare provider."
     else:
+        # Judge and summarize only what the labels say about this pair
+        with get_metrics().span("select_text"):
+            pair_text = select_pair_text(drug1, drug2, drug1_texts, drug2_texts)
+        
+        if not pair_text:
+            # The texts are a small sample of labels mentioning each drug, so
+            # silence about the partner is no evidence the pair is safe
+            severity = "⚪ Unknown"
+            summary = (
+                f"No label text specific to {drug1} and {drug2} was found in the FDA database. "
+                "Consult healthcare provider."
+            )
+            return severity, summary
+        
         if show_progress:
             print(f"   🎯 Analyzing severity...")
-        severity = detect_severity(combined)
+        with get_metrics().span("detect_severity"):
+            severity = detect_severity(pair_text)
         
+        def upgrade(summary):
+            cache_result(drug1, drug2, severity, summary)
+        
+        with get_metrics().span("summarize"):
+            if show_progress:
+                # Render the summary progressively as Ollama generates it
+                print(f"   🤖 Generating AI summary...\n   ", end="", flush=True)
+                summary = summarize_with_deadline(
+                    pair_text, drug1, drug2, deadline,
+                    on_text=lambda text: print(text, end="", flush=True), on_upgrade=upgrade
+                )
+                print()
+                if summary.startswith(EXTRACTIVE_PREFIX):
+                    print("   ⏱️ AI summary not ready in time; quoting the label instead.")
+            else:
+                summary = summarize_with_deadline(pair_text, drug1, drug2, deadline, on_upgrade=upgrade)
+    
+    return severity, summary
+
+def check_interaction(drug1, drug2, show_progress=True, use_cache=True, deadline=SUMMARY_DEADLINE_SECONDS):
+    """Main function to check drug interactions.
+    
+    deadline bounds the whole check in seconds: once labels are in, Ollama
+    gets whatever remains before an extractive summary is used.
+    """
+    started = time.monotonic()
+    entered = (drug1.strip(), drug2.strip())
+    drug1 = canonicalize_drug_name(drug1)
+    drug2 = canonicalize_drug_name(drug2)
+    metrics = get_metrics()
+    
+    if show_progress:
+        print(f"\n🔍 Checking: {entered[0].title()} + {entered[1].title()}")
+        if (drug1, drug2) != tuple(name.lower() for name in entered):
+            print(f"   🔁 As: {drug1.title()} + {drug2.title()}")
+    
+    with metrics.span("check_interaction"):
+        # Check cache first
+        if use_cache:
+            with metrics.span("cache_lookup"):
+                cached = get_cached_result(drug1, drug2)
+            if cached:
+                if show_progress:
+                    print("   ⚡ Using cached result..." + (" (refreshing in background)" if cached['stale'] else ""))
+                
+                with metrics.span("history_write"):
+                    add_to_history(drug1, drug2, cached['severity'], cached['summary'])
+                return build_result_table(drug1, drug2, cached['severity'], cached['summary'])
+        
+        # Fetch fresh data for both drugs in parallel
         if show_progress:
-            print(f"   🤖 Generating AI summary...")
-        summary = summarize_with_ollama(combined, drug1, drug2)
+            print(f"   📡 Fetching {drug1} and {drug2} data...")
+        with metrics.span("fetch_labels"):
+            labels = fetch_drug_interactions_concurrently([drug1, drug2])
+        
+        remaining = None if deadline is None else deadline - (time.monotonic() - started)
+        severity, summary = analyze_interaction(
+            drug1, drug2, labels[drug1], labels[drug2], show_progress, deadline=remaining
+        )
+        
+        # Cache the result
+        with metrics.span("cache_write"):
+            cache_result(drug1, drug2, severity, summary)
+        
+        # Add to history
+        with metrics.span("history_write"):
+            add_to_history(drug1, drug2, severity, summary)
+        
+        return build_result_table(drug1, drug2, severity, summary)
+
+def evaluate_interaction(drug1, drug2, use_cache=True, deadline=None):
+    """Check a pair without printing, returning the result as a dict.
     
-    # Cache the result
-    cache_result(drug1, drug2, severity, summary)
+    deadline bounds the check in seconds as in check_interaction.
+    """
+    started = time.monotonic()
+    drug1 = canonicalize_drug_name(drug1)
+    drug2 = canonicalize_drug_name(drug2)
+    
+    cached = get_cached_result(drug1, drug2) if use_cache else None
+    if cached:
+        severity, summary = cached['severity'], cached['summary']
+    else:
+        labels = fetch_drug_interactions_concurrently([drug1, drug2])
+        if deadline is None:
+            # Summaries share the Ollama pool so its concurrency cap holds process-wide
+            severity, summary = get_summary_executor().submit(
+                analyze_interaction, drug1, drug2, labels[drug1], labels[drug2]
+            ).result()
+        else:
+            # Here the summarizer queues Ollama on that pool itself and stops waiting in time
+            severity, summary = analyze_interaction(
+                drug1, drug2, labels[drug1], labels[drug2], deadline=deadline - (time.monotonic() - started)
+            )
+        cache_result(drug1, drug2, severity, summary)
     
-    # Add to history
     add_to_history(drug1, drug2, severity, summary)
+    return {"drug1": drug1, "drug2": drug2, "severity": severity, "summary": summary, "cached": bool(cached)}
+
+def check_drug_against_many(new_drug, other_drugs, max_concurrency=None, use_cache=True, deadline=None):
+    """Check one drug against many, yielding (other, severity, summary) as each pair finishes.
+    
+    deadline bounds the whole check in seconds as in run_pair_pipeline.
+    """
+    new_drug = canonicalize_drug_name(new_drug)
+    others = dict.fromkeys(canonicalize_drug_name(d) for d in other_drugs)
+    pairs = ((other, new_drug) for other in others if other != new_drug)
+    for other, _, severity, summary, _ in run_pair_pipeline(pairs, max_concurrency, use_cache, deadline=deadline):
+        yield other, severity, summary
+
+def run_pair_pipeline(pairs, max_concurrency=None, use_cache=True, record_history=True, deadline=None):
+    """Check many (drug1, drug2) pairs, yielding results as each pair finishes.
+    
+    Yields (drug1, drug2, severity, summary, cached) tuples. Cached pairs
+    come back immediately. For the rest, labels are fetched concurrently
+    (at most max_concurrency at a time), the labels newly needed when the
+    window is refilled are fetched together in combined queries, a label
+    needed by several pairs is fetched once, and each pair's AI summary
+    starts as soon as both its labels arrive. Pairs are read lazily and
+    only a bounded window is in flight, so memory stays flat however long
+    the input is. Checked pairs go to history unless record_history is False.
+    
+    deadline (seconds from the start of the run) bounds how long any pair
+    waits for its AI summary, as in analyze_interaction; None waits for
+    Ollama as long as it takes.
+    """
+    max_concurrency = max_concurrency or MAX_CONCURRENT_FETCHES
+    window = max_concurrency * 4
+    summary_executor = get_summary_executor()
+    finished = queue.Queue()
+    run_started = time.monotonic()
+    label_futures = {}
+    label_refs = {}
+    unfetched = []
+    
+    def start_pair(drug1, drug2):
+        for drug in {drug1, drug2}:
+            if drug not in label_futures:
+                label_futures[drug] = Future()
+                unfetched.append(drug)
+            label_refs[drug] = label_refs.get(drug, 0) + 1
+        futures = (label_futures[drug1], label_futures[drug2])
+        started = threading.Lock()
+        
+        def on_label(_):
+            # Runs once per label; the second one to finish starts the summary
+            if not all(f.done() for f in futures) or not started.acquire(blocking=False):
+                return
+            # Label errors surface through the summary future to the caller
+            if deadline is None:
+                summary_future = summary_executor.submit(
+                    lambda: analyze_interaction(drug1, drug2, futures[0].result(), futures[1].result())
+                )
+            else:
+                # analyze_interaction queues Ollama on the summary pool and gives up at the
+                # deadline, so it waits here rather than on (and starving) that pool
+                remaining = max(0.0, deadline - (time.monotonic() - run_started))
+                summary_future = wait_pool.submit(
+                    lambda: analyze_interaction(
+                        drug1, drug2, futures[0].result(), futures[1].result(), deadline=remaining
+                    )
+                )
+            summary_future.add_done_callback(lambda f: finished.put((drug1, drug2, f)))
+        
+        for future in futures:
+            future.add_done_callback(on_label)
+    
+    def fetch_labels(drugs):
+        futures = {drug: label_futures[drug] for drug in drugs}
+        
+        def deliver(bulk_future):
+            # An exception escaping a done-callback is dropped, leaving the pair waiting forever
+            for drug, future in futures.items():
+                try:
+                    future.set_result(bulk_future.result()[drug])
+                except Exception as e:
+                    future.set_exception(e)
+        
+        fetch_pool.submit(get_drug_interactions_bulk, drugs, use_cache=use_cache).add_done_callback(deliver)
+    
+    def release_labels(drug1, drug2):
+        for drug in {drug1, drug2}:
+            label_refs[drug] -= 1
+            if not label_refs[drug]:
+                del label_refs[drug]
+                del label_futures[drug]
+    
+    pairs = iter(pairs)
+    in_flight = 0
+    exhausted = False
+    # Threads start on first use, so wait_pool costs nothing without a deadline
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="batch-fetch") as fetch_pool, \
+            ThreadPoolExecutor(max_workers=window, thread_name_prefix="batch-wait") as wait_pool:
+        while True:
+            # Top the window up from the input once half of it has drained,
+            # so each refill has enough new labels to fetch in combined queries
+            refill = in_flight <= window // 2
+            while refill and not exhausted and in_flight < window:
+                pair = next(pairs, None)
+                if pair is None:
+                    exhausted = True
+                    break
+                drug1, drug2 = canonicalize_drug_name(pair[0]), canonicalize_drug_name(pair[1])
+                cached = get_cached_result(drug1, drug2) if use_cache else None
+                if cached:
+                    if record_history:
+                        add_to_history(drug1, drug2, cached['severity'], cached['summary'])
+                    yield drug1, drug2, cached['severity'], cached['summary'], True
+                    continue
+                start_pair(drug1, drug2)
+                in_flight += 1
+            for start in range(0, len(unfetched), BULK_QUERY_MAX_DRUGS):
+                fetch_labels(unfetched[start:start + BULK_QUERY_MAX_DRUGS])
+            unfetched.clear()
+            
+            if not in_flight:
+                break
+            
+            drug1, drug2, future = finished.get()
+            in_flight -= 1
+            release_labels(drug1, drug2)
+            severity, summary = future.result()
+            cache_result(drug1, drug2, severity, summary)
+            if record_history:
+                add_to_history(drug1, drug2, severity, summary)
+            yield drug1, drug2, severity, summary, False
+
+# ============================================================================
+# REGIMEN MATRIX
+# ============================================================================
+
+def get_regimen_matrix():
+    """Get stored regimen matrix rows keyed by get_cache_key."""
+    rows = get_db().execute("SELECT * FROM regimen_matrix").fetchall()
+    return {row['key']: dict(row) for row in rows}
+
+_regimen_matrix_lock = threading.Lock()
+
+def update_regimen_matrix(show_progress=True, max_concurrency=None, record_history=True):
+    """Compute the saved-medication pairs missing from the regimen matrix.
+    
+    Rows stored while a lookup or summary was failing count as missing,
+    so they are recomputed once the upstreams recover. Updates run one
+    at a time, so one started while another is running (e.g. the grid
+    opened during add_medication's background update) waits for it and
+    computes only what is still missing.
+    """
+    with _regimen_matrix_lock:
+        return _update_regimen_matrix(show_progress, max_concurrency, record_history)
+
+def _update_regimen_matrix(show_progress, max_concurrency, record_history):
+    meds = get_my_medications()
+    known = {
+        key for key, row in get_regimen_matrix().items()
+        if not is_provisional_result(row['severity'], row['summary'])
+    }
+    missing = [
+        (a, b) for i, a in enumerate(meds) for b in meds[i + 1:]
+        if get_cache_key(a, b) not in known and canonicalize_drug_name(a) != canonicalize_drug_name(b)
+    ]
+    if not missing:
+        return 0
+    
+    if show_progress:
+        print(f"\n🧮 Checking {len(missing)} new pair(s) in your regimen...")
+    for drug1, drug2, severity, summary, _ in run_pair_pipeline(
+        missing, max_concurrency, record_history=record_history
+    ):
+        with get_db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO regimen_matrix (key, drug1, drug2, severity, summary, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (get_cache_key(drug1, drug2), drug1, drug2, severity, summary, datetime.now().isoformat())
+            )
+        if show_progress:
+            print(f"   {severity}: {drug1.title()} + {drug2.title()}")
+    return len(missing)
+
+def show_regimen_matrix():
+    """Display every pair of saved medications as a severity grid."""
+    meds = get_my_medications()
+    if len(meds) < 2:
+        print("\n⚠️ Save at least two medications to see their interaction grid.")
+        return
+    
+    update_regimen_matrix()
+    matrix = get_regimen_matrix()
     
-    # Create result table
     table = PrettyTable()
-    table.field_names = ["Drug A", "Drug B", "Severity", "Summary"]
-    table.max_width["Summary"] = 60
-    table.add_row([drug1.title(), drug2.title(), severity, summary])
+    table.field_names = [""] + [med.title()[:12] for med in meds]
+    for a in meds:
+        row = [a.title()[:12]]
+        for b in meds:
+            if canonicalize_drug_name(a) == canonicalize_drug_name(b):
+                row.append("—")
+            else:
+                entry = matrix.get(get_cache_key(a, b))
+                row.append(entry['severity'].split()[0] if entry else "…")
+        table.add_row(row)
     
-    return table
+    print("\n🧮 Regimen Interaction Grid:")
+    print(table)
+    print("🔴 High  🟡 Moderate  🟢 Low  ⚪ Unknown")
+    
+    # Spell out anything worth reading in full
+    flagged = [e for e in matrix.values() if e['severity'].startswith(("🔴", "🟡"))]
+    for entry in sorted(flagged, key=lambda e: e['severity']):
+        print(f"\n{entry['severity']}: {entry['drug1'].title()} + {entry['drug2'].title()}")
+        print(f"   {entry['summary']}")
+
+# ============================================================================
+# STARTUP WARM-UP
+# ============================================================================
+
+def get_ollama_base_url():
+    """Get the Ollama server root that OLLAMA_API lives under."""
+    url = urlsplit(OLLAMA_API)
+    return f"{url.scheme}://{url.netloc}"
+
+def preload_ollama_model():
+    """Check Ollama is up and load OLLAMA_MODEL so the first summary doesn't wait for it.
+    
+    Returns "ready", "no-model" (Ollama is up but the model didn't load)
+    or "down".
+    """
+    try:
+        get_http_session().get(get_ollama_base_url(), timeout=2).raise_for_status()
+    except requests.exceptions.RequestException:
+        return "down"
+    
+    # A generate request without a prompt only loads the model
+    try:
+        with get_metrics().span("ollama_preload"):
+            response = request_with_retries(
+                "POST", OLLAMA_API, "ollama", max_retries=0,
+                json={"model": OLLAMA_MODEL, "keep_alive": OLLAMA_KEEP_ALIVE}, timeout=(3.05, 300)
+            )
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        return "no-model"
+    return "ready"
+
+def prefetch_saved_labels():
+    """Fetch the saved medications' labels into the label cache."""
+    meds = get_my_medications()
+    if meds:
+        get_drug_interactions_bulk(meds)
+
+def prefetch_regimen_matrix(model_status):
+    """Fill in the regimen matrix once the model has loaded, leaving history alone."""
+    if model_status.result() == "ready":
+        update_regimen_matrix(show_progress=False, record_history=False)
+
+def start_warmup(prefetch=STARTUP_PREFETCH):
+    """Preload Ollama and prefetch for the saved medications off the main thread.
+    
+    Returns a future for preload_ollama_model's status. Warm-up is best
+    effort: if it fails, the first check simply does the work itself.
+    """
+    model_status = get_background_executor().submit(preload_ollama_model)
+    if prefetch in ("labels", "all"):
+        get_fetch_executor().submit(prefetch_saved_labels)
+    if prefetch == "all":
+        # Queued behind the preload on the same single thread
+        get_background_executor().submit(prefetch_regimen_matrix, model_status)
+    return model_status
+
+def print_ollama_status(status):
+    """Print what the startup Ollama check found."""
+    if status == "ready":
+        print(f"✓ Ollama detected and running ({OLLAMA_MODEL} loaded)")
+    elif status == "no-model":
+        print(f"⚠️ Warning: Ollama is running but couldn't load {OLLAMA_MODEL}. Try `ollama pull {OLLAMA_MODEL}`.")
+    else:
+        print("⚠️ Warning: Ollama may not be running. Start it for AI summaries.")
 
 # ============================================================================
 # EXPORT FUNCTIONALITY
@@ -397,9 +2425,9 @@ def check_interaction(drug1, drug2, show_progress=True, use_cache=True):
 
 def export_history_to_text():
     """Export history to a text file."""
-    history = load_json(HISTORY_FILE)
+    conn = get_db()
     
-    if not history:
+    if not conn.execute("SELECT 1 FROM history LIMIT 1").fetchone():
         print("\n⚠️ No history to export.\n")
         return
     
@@ -407,13 +2435,14 @@ def export_history_to_text():
     filepath = DATA_DIR / filename
     
     try:
-        with open(filepath, 'w') as f:
+        with atomic_write(filepath) as f:
             f.write("=" * 70 + "\n")
             f.write("DRUG INTERACTION CHECK HISTORY\n")
             f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write("=" * 70 + "\n\n")
             
-            for entry in reversed(history):
+            # Stream rows newest-first straight from the database
+            for entry in conn.execute("SELECT * FROM history ORDER BY id DESC"):
                 timestamp = datetime.fromisoformat(entry['timestamp']).strftime("%Y-%m-%d %H:%M")
                 f.write(f"[{timestamp}]\n")
                 f.write(f"Drugs: {entry['drug1'].title()} + {entry['drug2'].title()}\n")
@@ -425,6 +2454,338 @@ def export_history_to_text():
     except Exception as e:
         print(f"\n⚠️ Error exporting history: {e}\n")
 
+# ============================================================================
+# BATCH MODE
+# ============================================================================
+
+HEADER_CELL = re.compile(r"^(drug[ _]?\w*|regimen|drugs)$", re.IGNORECASE)
+
+def parse_batch_line(line):
+    """Parse one input line into a list of drug names.
+    
+    JSONL lines may be {"drug1": ..., "drug2": ...}, {"drugs": [...]} (or
+    "drugs": "a,b,c") or a plain JSON list; anything else is read as a CSV row. Two names are a
+    pair, more are a regimen.
+    """
+    line = line.strip()
+    if not line:
+        return []
+    if line[0] in "{[":
+        record = json.loads(line)
+        if isinstance(record, dict):
+            drugs = record.get("drugs") or [record.get("drug1"), record.get("drug2")]
+        else:
+            drugs = record
+        # "a,b,c" is a regimen as for the service's /regimen, not a list of characters
+        if isinstance(drugs, str):
+            drugs = drugs.split(",")
+        elif not isinstance(drugs, list):
+            raise ValueError(f"drugs must be a list of names, not {type(drugs).__name__}")
+    else:
+        drugs = next(csv.reader([line]))
+    return [d.strip() for d in drugs if isinstance(d, str) and d.strip()]
+
+def iter_batch_pairs(lines, stats):
+    """Yield each distinct pair from pair and regimen lines, skipping repeats."""
+    # Seen keys live in a temp table so memory stays flat on huge inputs
+    conn = get_db()
+    with conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_seen (key TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM batch_seen")
+    
+    for line_number, line in enumerate(lines, 1):
+        try:
+            drugs = parse_batch_line(line)
+        except (ValueError, csv.Error) as e:
+            stats['errors'] += 1
+            print(f"⚠️ Line {line_number}: {e}", file=sys.stderr)
+            continue
+        if line_number == 1 and drugs and all(HEADER_CELL.match(d) for d in drugs):
+            continue
+        
+        for i in range(len(drugs)):
+            for j in range(i + 1, len(drugs)):
+                if canonicalize_drug_name(drugs[i]) == canonicalize_drug_name(drugs[j]):
+                    stats['duplicates'] += 1
+                    continue
+                key = get_cache_key(drugs[i], drugs[j])
+                # Commit right away so no transaction stays open across the yield
+                with conn:
+                    is_new = conn.execute("INSERT OR IGNORE INTO batch_seen (key) VALUES (?)", (key,)).rowcount
+                if not is_new:
+                    stats['duplicates'] += 1
+                    continue
+                yield drugs[i], drugs[j]
+
+def print_batch_progress(stats, started, final=False):
+    """Print throughput and progress counters to stderr."""
+    elapsed = time.monotonic() - started
+    rate = stats['done'] / elapsed if elapsed else 0.0
+    end = "\n" if final else ""
+    print(
+        f"\r⏱ {stats['done']} pairs ({stats['cached']} cached) | "
+        f"{stats['duplicates']} duplicates skipped | {stats['errors']} bad lines | "
+        f"{rate:.1f} pairs/s | {elapsed:.1f}s",
+        end=end, file=sys.stderr, flush=True
+    )
+
+def run_batch(input_path="-", output=None, max_concurrency=None, use_cache=True, show_progress=True):
+    """Check every pair in a CSV/JSONL file (or stdin), streaming JSONL results."""
+    output = output or sys.stdout
+    stats = {"done": 0, "cached": 0, "duplicates": 0, "errors": 0}
+    started = time.monotonic()
+    last_report = started
+    
+    source = sys.stdin if input_path == "-" else open(input_path, newline="")
+    try:
+        pairs = iter_batch_pairs(source, stats)
+        for drug1, drug2, severity, summary, cached in run_pair_pipeline(pairs, max_concurrency, use_cache):
+            output.write(json.dumps({
+                "drug1": drug1,
+                "drug2": drug2,
+                "key": get_cache_key(drug1, drug2),
+                "severity": severity,
+                "summary": summary,
+                "cached": cached
+            }, ensure_ascii=False) + "\n")
+            output.flush()
+            
+            stats['done'] += 1
+            stats['cached'] += cached
+            if show_progress and time.monotonic() - last_report >= 1:
+                print_batch_progress(stats, started)
+                last_report = time.monotonic()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    
+    if show_progress:
+        print_batch_progress(stats, started, final=True)
+    return stats
+
+# ============================================================================
+# SERVICE MODE
+# ============================================================================
+
+HTTP_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error", 503: "Service Unavailable"
+}
+
+class ServiceBusy(Exception):
+    """Raised when too many uncached checks are already in flight."""
+
+class InteractionService:
+    """Asyncio HTTP/JSON front end for the checker, e.g. for the Flutter app.
+    
+    Concurrent requests for the same pair (same get_cache_key) share one
+    in-flight computation. Checks run on a worker pool over the shared
+    HTTP session, caches and Ollama pool. Admission reserves pending
+    slots up front: one per uncached pair, and one per pair of a regimen
+    (capped at the whole budget, so any regimen can run on an otherwise
+    idle service). Requests that would take pending past
+    SERVICE_MAX_PENDING are refused with 503.
+    """
+    
+    def __init__(self, max_pending=SERVICE_MAX_PENDING, workers=SERVICE_WORKERS):
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+        self.in_flight = {}
+        self.pending = 0
+        self.stats = {"requests": 0, "cache_hits": 0, "computed": 0, "coalesced": 0, "rejected": 0}
+    
+    async def run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+    
+    def admit(self, slots=1):
+        """Reserve pending slots, or raise ServiceBusy if that would exceed max_pending."""
+        slots = min(slots, self.max_pending)
+        if self.pending + slots > self.max_pending:
+            self.stats['rejected'] += 1
+            raise ServiceBusy()
+        self.pending += slots
+        return slots
+    
+    def release(self, slots):
+        self.pending -= slots
+    
+    @staticmethod
+    def lookup_pair(drug1, drug2):
+        """Canonicalize a pair and check the pair cache (SQLite, so off the event loop)."""
+        drug1, drug2 = canonicalize_drug_name(drug1), canonicalize_drug_name(drug2)
+        return drug1, drug2, bool(get_cached_result(drug1, drug2))
+    
+    @staticmethod
+    def regimen_pairs(drugs, new_drug=None):
+        """Canonicalize a regimen into the pairs to check (SQLite, so off the event loop)."""
+        drugs = list(dict.fromkeys(canonicalize_drug_name(d) for d in drugs if d.strip()))
+        if new_drug:
+            new_drug = canonicalize_drug_name(new_drug)
+            return [(d, new_drug) for d in drugs if d != new_drug]
+        return [(a, b) for i, a in enumerate(drugs) for b in drugs[i + 1:]]
+    
+    async def check(self, drug1, drug2, admitted=False):
+        """Check one pair, joining an identical in-flight check if there is one.
+        
+        admitted pairs belong to a regimen whose slots are already reserved.
+        """
+        drug1, drug2, cached = await self.run_blocking(self.lookup_pair, drug1, drug2)
+        key = get_cache_key(drug1, drug2)
+        
+        # The in-flight table is only touched on the event loop, so check-and-insert is atomic
+        task = self.in_flight.get(key)
+        if task:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(task)
+        
+        if cached:
+            self.stats['cache_hits'] += 1
+            return await self.run_blocking(evaluate_interaction, drug1, drug2, True, SERVICE_SUMMARY_DEADLINE_SECONDS)
+        
+        slots = 0 if admitted else self.admit()
+        
+        self.stats['computed'] += 1
+        task = asyncio.ensure_future(
+            self.run_blocking(evaluate_interaction, drug1, drug2, True, SERVICE_SUMMARY_DEADLINE_SECONDS)
+        )
+        self.in_flight[key] = task
+        
+        def done(_):
+            self.in_flight.pop(key, None)
+            self.release(slots)
+        
+        task.add_done_callback(done)
+        return await asyncio.shield(task)
+    
+    async def check_regimen(self, drugs, new_drug=None):
+        """Check a new drug against a regimen, or every pair within it."""
+        pairs = await self.run_blocking(self.regimen_pairs, drugs, new_drug)
+        
+        # Reserve the whole regimen up front; its pairs then queue on the
+        # worker pool, so an admitted regimen is never refused halfway through
+        slots = self.admit(len(pairs))
+        try:
+            # Warm the distinct labels in a few combined queries so the pairs don't race to fetch them
+            distinct = list(dict.fromkeys(d for pair in pairs for d in pair))
+            await self.run_blocking(get_drug_interactions_bulk, distinct)
+            return await asyncio.gather(*(self.check(a, b, admitted=True) for a, b in pairs))
+        finally:
+            self.release(slots)
+    
+    async def dispatch(self, method, target, body):
+        """Route a request, returning (status, payload)."""
+        url = urlsplit(target)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if method == "POST":
+            query.update(json.loads(body or b"{}"))
+        
+        if url.path == "/health":
+            return 200, {"status": "ok", "in_flight": len(self.in_flight), "pending": self.pending, **self.stats}
+        if url.path == "/metrics":
+            if not get_metrics().enabled:
+                return 404, {"error": "metrics are off; start the service with --profile"}
+            if query.get("format") == "json":
+                return 200, get_metrics().snapshot()
+            return 200, get_metrics().to_prometheus()
+        if url.path == "/check":
+            if not query.get("drug1") or not query.get("drug2"):
+                return 400, {"error": "drug1 and drug2 are required"}
+            if not isinstance(query['drug1'], str) or not isinstance(query['drug2'], str):
+                return 400, {"error": "drug1 and drug2 must be strings"}
+            return 200, await self.check(query['drug1'], query['drug2'])
+        if url.path == "/regimen":
+            drugs = query.get("drugs") or []
+            if isinstance(drugs, str):
+                drugs = drugs.split(",")
+            if not isinstance(drugs, list) or not all(isinstance(d, str) for d in drugs):
+                return 400, {"error": "drugs must be a list of strings"}
+            if query.get("drug") is not None and not isinstance(query['drug'], str):
+                return 400, {"error": "drug must be a string"}
+            if len(drugs) + bool(query.get("drug")) < 2:
+                return 400, {"error": "at least two drugs are required"}
+            return 200, {"results": await self.check_regimen(drugs, query.get("drug"))}
+        if url.path == "/suggest":
+            partial = query.get("q", "")
+            if not isinstance(partial, str):
+                return 400, {"error": "q must be a string"}
+            limit = int(query.get("limit", 5))
+            suggestions = await self.run_blocking(autocomplete_drug_names, partial, limit)
+            if not suggestions and len(partial) >= 3:
+                suggestions = await self.run_blocking(search_drug_suggestions, partial, limit)
+            return 200, {"suggestions": suggestions}
+        return 404, {"error": f"unknown endpoint {url.path}"}
+    
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+                
+                self.stats['requests'] += 1
+                extra_headers = ""
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except ServiceBusy:
+                    status, payload = 503, {"error": "busy, retry shortly"}
+                    extra_headers = "Retry-After: 1\r\n"
+                except (ValueError, TypeError) as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    print(f"⚠️ {method} {target} failed: {e}", file=sys.stderr)
+                    status, payload = 500, {"error": "internal error"}
+                
+                if isinstance(payload, str):
+                    data = payload.encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                    content_type = "application/json; charset=utf-8"
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write((
+                    f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    "Access-Control-Allow-Origin: *\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    f"{extra_headers}\r\n"
+                ).encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT, ready=None):
+        """Accept connections until cancelled; ready(port) is called once listening."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        if ready:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+def run_service(host=SERVICE_HOST, port=SERVICE_PORT):
+    """Run the JSON service in the foreground."""
+    service = InteractionService()
+    # Load the model now rather than on the first request
+    get_background_executor().submit(preload_ollama_model)
+    print(f"🌐 Drug Interaction Checker service on http://{host}:{port}")
+    print("   GET /check?drug1=&drug2=  |  POST /regimen {\"drugs\": [...]}  |  GET /suggest?q=")
+    if get_metrics().enabled:
+        print("   GET /metrics (Prometheus text, or ?format=json)")
+    asyncio.run(service.serve(host, port))
+
 # ============================================================================
 # USER INTERFACE
 # ============================================================================
@@ -460,7 +2821,8 @@ def manage_medications_menu():
         print("1. View my medications")
         print("2. Add medication")
         print("3. Remove medication")
-        print("4. Back to main menu")
+        print("4. View interaction grid")
+        print("5. Back to main menu")
         print("─" * 70)
         
         choice = input("\nChoice: ").strip()
@@ -481,6 +2843,8 @@ def manage_medications_menu():
             else:
                 print("\n⚠️ Please enter a medication name.")
         elif choice == "4":
+            show_regimen_matrix()
+        elif choice == "5":
             break
         else:
             print("\n⚠️ Invalid choice. Please try again.")
@@ -494,7 +2858,8 @@ def get_drug_input(prompt):
     
     # If drug is very short, offer suggestions
     if len(drug) >= 3:
-        suggestions = search_drug_suggestions(drug)
+        # Local index first; only ask OpenFDA when it knows nothing
+        suggestions = autocomplete_drug_names(drug) or search_drug_suggestions(drug)
         if suggestions and drug not in suggestions:
             print(f"\n💡 Suggestions: {', '.join(suggestions[:5])}")
             use_suggestion = input("Use one of these? (y/n): ").strip().lower()
@@ -513,24 +2878,24 @@ def clear_cache():
     """Clear interaction cache."""
     confirm = input("\n⚠️ Clear all cached interactions? (y/n): ").strip().lower()
     if confirm == 'y':
-        save_json(CACHE_FILE, {})
+        with get_db() as conn:
+            conn.execute("DELETE FROM pair_cache")
         print("\n✓ Cache cleared.\n")
     else:
         print("\n✓ Cache not cleared.\n")
 
-def main():
+def main(prefetch=STARTUP_PREFETCH):
     """Main application loop."""
     setup_data_directory()
     print_header()
     
-    # Quick Ollama check
-    try:
-        requests.get("http://localhost:11434", timeout=2)
-        print("✓ Ollama detected and running")
-    except:
-        print("⚠️ Warning: Ollama may not be running. Start it for AI summaries.")
+    # Check Ollama and warm caches in the background; report once it's known
+    ollama_status = start_warmup(prefetch)
     
     while True:
+        if ollama_status is not None and ollama_status.done():
+            print_ollama_status(ollama_status.result())
+            ollama_status = None
         print_menu()
         choice = input("\nChoice: ").strip()
         
@@ -583,13 +2948,93 @@ def main():
         else:
             print("\n⚠️ Invalid choice. Please try again.")
 
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Drug Interaction Checker")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="directory for the database and exports")
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="answer only from the local label index, never the live OpenFDA API"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="time each stage and print a summary of timings, cache hits and upstream calls on exit"
+    )
+    parser.add_argument(
+        "--prefetch", choices=["none", "labels", "all"], default=STARTUP_PREFETCH,
+        help="what the interactive menu warms for your saved medications at startup"
+    )
+    parser.add_argument(
+        "--metrics-out", metavar="FILE",
+        help="write metrics on exit (JSON if FILE ends in .json, else Prometheus text); implies timing"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    
+    ingest = subparsers.add_parser("ingest", help="build the local label index from openFDA bulk downloads")
+    ingest.add_argument("files", nargs="+", help="drug-label-*.json or .json.zip files from open.fda.gov")
+    
+    batch = subparsers.add_parser("batch", help="check drug pairs or regimens from CSV/JSONL, streaming JSONL results")
+    batch.add_argument("input", nargs="?", default="-", help="input file, or - for stdin (default)")
+    batch.add_argument("-c", "--concurrency", type=int, default=MAX_CONCURRENT_FETCHES, help="label fetches in flight")
+    batch.add_argument("--no-cache", action="store_true", help="ignore cached results and labels")
+    batch.add_argument("-q", "--quiet", action="store_true", help="don't print progress to stderr")
+    
+    serve = subparsers.add_parser("serve", help="run the local HTTP/JSON service")
+    serve.add_argument("--host", default=SERVICE_HOST)
+    serve.add_argument("--port", type=int, default=SERVICE_PORT)
+    
+    return parser.parse_args(argv)
+
+def run_cli(argv=None):
+    """Dispatch to a subcommand or start the interactive menu."""
+    global LIVE_API_FALLBACK
+    args = parse_args(argv)
+    if args.offline:
+        LIVE_API_FALLBACK = False
+    set_data_directory(args.data_dir)
+    if args.profile or args.metrics_out:
+        enable_metrics()
+    if args.offline and args.command != "ingest":
+        setup_data_directory()
+        if not label_index_ready():
+            print(
+                "⚠️ Offline with no local label index: only cached labels are used. "
+                "Run `drug_checker.py ingest` first.", file=sys.stderr
+            )
+    
+    try:
+        if args.command == "ingest":
+            setup_data_directory()
+            ingest_label_dump(args.files)
+        elif args.command == "batch":
+            setup_data_directory()
+            run_batch(args.input, max_concurrency=args.concurrency, use_cache=not args.no_cache, show_progress=not args.quiet)
+        elif args.command == "serve":
+            setup_data_directory()
+            run_service(args.host, args.port)
+        else:
+            main(args.prefetch)
+    finally:
+        metrics = get_metrics()
+        if metrics.enabled:
+            if args.metrics_out:
+                export_metrics(metrics, args.metrics_out)
+            if args.profile:
+                # Batch output owns stdout, so the profile goes to stderr there
+                with contextlib.redirect_stdout(sys.stderr if args.command == "batch" else sys.stdout):
+                    print_profile(metrics)
+
 # ============================================================================
 # ENTRY POINT
 # ============================================================================
 
 if __name__ == "__main__":
     try:
-        main()
+        run_cli()
     except KeyboardInterrupt:
         print("\n\n👋 Interrupted. Goodbye!\n")
     except Exception as e: